@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 # The learner only needs to expose select_action() and update();
@@ -20,6 +21,9 @@ class RLAgent:
         Multiplicative ε decay applied after every episode.
     eps_min : float, optional
         Minimum exploration rate.
+    metrics : telemetry.Metrics, optional
+        Receives move counts and time spent in select / env step / update;
+        defaults to the learner's own ``metrics`` if it has one.
     """
 
     def __init__(
@@ -29,12 +33,14 @@ class RLAgent:
         epsilon: float = 0.1,
         decay: float = 0.9995,
         eps_min: float = 0.01,
+        metrics: Any | None = None,
     ) -> None:
         self.env = env
         self.ln = learner
         self.eps = epsilon
         self.decay = decay
         self.eps_min = eps_min
+        self.metrics = metrics if metrics is not None else getattr(learner, "metrics", None)
 
     # ───────────────────────────── public API ──────────────────────────────
 
@@ -49,19 +55,37 @@ class RLAgent:
         state = self.env.reset()
         done = False
         total = 0.0
+        moves = 0
+        t_select = t_step = t_update = 0.0
+        clock = time.perf_counter
 
         while not done:
+            t0 = clock()
             # ε‑greedy action selection via learner
             action = self.ln.select_action(state, self.eps)
+            t1 = clock()
 
             # environment transition
             nxt_state, reward, done, _ = self.env.step(action)
             total += reward
+            t2 = clock()
 
             # one‑step TD update (afterstate learner ignores `a_next`)
             self.ln.update(state, action, reward, nxt_state, None, done)
+            t3 = clock()
 
+            t_select += t1 - t0
+            t_step += t2 - t1
+            t_update += t3 - t2
+            moves += 1
             state = nxt_state
+
+        m = self.metrics
+        if m is not None:
+            m.moves += moves
+            m.add_time("select", t_select)
+            m.add_time("step", t_step)
+            m.add_time("update", t_update)
         # decay ε after the episode ends
         self.eps = max(self.eps_min, self.eps * self.decay)
         return total
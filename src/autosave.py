@@ -0,0 +1,218 @@
+"""Background, incremental checkpoints of a learner's weight tables.
+
+    saver = CheckpointManager(learner, "run/weights", keep=3, interval=300)
+    state = saver.resume(agent)        # latest checkpoint: weights, ε, episodes
+    episodes = state.get("episodes", 0)
+    while episodes < total:
+        agent.run_episode()
+        episodes += 1
+        saver.maybe_checkpoint(episodes, agent.eps)
+    saver.close()
+
+Checkpoints rotate through *keep* slot files ``prefix.K.bin`` (ordinary
+`checkpoint` files, so `FeatureTD0Learner.load` reads them) with a
+``prefix.K.json`` sidecar holding the sequence number, episode count and ε.
+
+Patterns flag the ``2**shift``‑entry chunks their updates touch
+(`pattern.track_dirty`).  A checkpoint drains those flags on the training
+thread and copies only the chunks the target slot lacks, i.e. those changed
+since that slot was last written *keep* checkpoints ago; a writer thread
+then writes the copies in place while training goes on.  The first write
+of each slot in a session copies everything.  A slot's sidecar is removed
+before its data are touched and written back only after they are synced,
+so a crash mid‑write leaves the other slots intact and `resume` takes the
+newest complete one.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+import checkpoint
+from features import info
+from learners import FeatureTD0Learner
+
+__all__ = ["CheckpointManager"]
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """``[start, stop)`` rows of the runs of nonzero bytes in *mask*."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges.reshape(-1, 2)
+
+
+class CheckpointManager:
+    """Rotating incremental checkpoints of *learner* (see the module docstring).
+
+    Args:
+        learner:  a `FeatureTD0Learner` over dense patterns; dirty tracking
+                  is switched on for its features.
+        prefix:   slot files are ``prefix.0.bin`` … ``prefix.{keep-1}.bin``.
+        keep:     number of checkpoints kept.
+        interval: seconds between checkpoints in `maybe_checkpoint`.
+        shift:    chunks hold ``2**shift`` table entries.
+    """
+
+    def __init__(
+        self,
+        learner: FeatureTD0Learner,
+        prefix: str,
+        keep: int = 3,
+        interval: float = 300.0,
+        shift: int = 14,
+    ):
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.learner = learner
+        self.prefix, self.keep, self.interval, self.shift = prefix, keep, interval, shift
+        self.seq = 0             # sequence number of the newest checkpoint
+        self.last_bytes = 0      # data copied by the last checkpoint
+        self.last_pause = 0.0    # seconds the last checkpoint held the caller
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._last = time.monotonic()
+        latest = self.latest()
+        if latest is not None:
+            self.seq = latest["seq"]  # keep numbering after an earlier run
+        self._attach()
+
+    def path(self, slot: int) -> str:
+        return f"{self.prefix}.{slot}.bin"
+
+    def _state_path(self, slot: int) -> str:
+        return f"{self.prefix}.{slot}.json"
+
+    def _attach(self) -> None:
+        """(Re)start tracking the learner's current features; all slots are
+        then rewritten in full on their next turn."""
+        self._features = list(self.learner.features)
+        self.learner.track_dirty(self.shift)
+        self._header, _, self._end = self._layout()
+        self._pending = [[np.ones(len(f.dirty), dtype=np.uint8) for f in self._features]
+                         for _ in range(self.keep)]
+        self._fresh = [True] * self.keep  # header not written this session
+
+    def _layout(self) -> tuple[bytes, list[list[tuple[int, np.ndarray]]], int]:
+        """Header, per‑feature ``(file position, array)`` blobs and file size.
+        Arrays are looked up afresh: fusing the network swaps them for views."""
+        header, _, blobs, end = checkpoint.layout(self._features, self.learner._meta())
+        return header, blobs, end
+
+    # ─────────────────────────── checkpoints ──────────────────────────────
+
+    def maybe_checkpoint(self, episodes: int, epsilon: float | None = None, **extra: Any) -> Optional[int]:
+        """`checkpoint` if *interval* seconds have passed since the last one."""
+        if time.monotonic() - self._last < self.interval:
+            return None
+        return self.checkpoint(episodes, epsilon, **extra)
+
+    def checkpoint(self, episodes: int, epsilon: float | None = None, **extra: Any) -> int:
+        """Snapshot the changed chunks and write them in the background.
+
+        Waits for the previous write first.  *extra* (JSON values) is stored
+        with *episodes* and *epsilon* in the sidecar.  Returns the sequence
+        number of the new checkpoint.
+        """
+        self.wait()
+        t0 = time.perf_counter()
+        if self._features != self.learner.features:  # features added or reloaded
+            self._attach()
+        for k, f in enumerate(self._features):
+            flags = np.frombuffer(f.dirty, dtype=np.uint8)
+            if flags.any():
+                for pending in self._pending:
+                    pending[k] |= flags
+                flags[:] = 0
+        self.seq += 1
+        slot = self.seq % self.keep
+        chunks, nbytes = [], 0
+        _, layout, _ = self._layout()
+        for f, blobs, mask in zip(self._features, layout, self._pending[slot]):
+            for start, stop in _runs(mask):
+                lo, hi = int(start) << self.shift, min(int(stop) << self.shift, f.size())
+                for pos, a in blobs:
+                    part = np.array(a[lo:hi])  # the consistent copy
+                    chunks.append((pos + lo * a.itemsize, part))
+                    nbytes += part.nbytes
+            mask[:] = 0
+        header = self._header if self._fresh[slot] else None
+        self._fresh[slot] = False
+        state = {"seq": self.seq, "episodes": episodes, "epsilon": epsilon, "time": time.time(), **extra}
+        self._thread = threading.Thread(target=self._write, args=(slot, header, chunks, state), daemon=True)
+        self._thread.start()
+        self._last = time.monotonic()
+        self.last_bytes = nbytes
+        self.last_pause = time.perf_counter() - t0
+        return self.seq
+
+    def _write(self, slot: int, header: bytes | None, chunks: list, state: dict) -> None:
+        try:
+            state_path = self._state_path(slot)
+            if os.path.exists(state_path):
+                os.remove(state_path)  # slot invalid until the data are synced
+            with open(self.path(slot), "wb" if header is not None else "r+b") as out:
+                if header is not None:
+                    out.write(header)
+                    out.truncate(self._end)
+                for pos, part in chunks:
+                    out.seek(pos)
+                    part.tofile(out)
+                out.flush()
+                os.fsync(out.fileno())
+            with open(state_path + ".tmp", "w") as out:
+                json.dump(state, out)
+            os.replace(state_path + ".tmp", state_path)
+        except BaseException as e:  # re-raised on the training thread by `wait`
+            self._error = e
+
+    def wait(self) -> None:
+        """Block until the write in flight (if any) is on disk."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            e, self._error = self._error, None
+            raise e
+
+    def close(self) -> None:
+        self.wait()
+
+    # ─────────────────────────── resume ───────────────────────────────────
+
+    def latest(self) -> Optional[dict]:
+        """Sidecar state of the newest complete checkpoint (plus its
+        ``path``), or None."""
+        best = None
+        for slot in range(self.keep):
+            try:
+                with open(self._state_path(slot)) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if os.path.exists(self.path(slot)) and (best is None or state["seq"] > best["seq"]):
+                best = {**state, "path": self.path(slot)}
+        return best
+
+    def resume(self, agent: Any = None) -> dict:
+        """Load the newest checkpoint into the learner, restore ε on *agent*
+        and the episode count in the learner's metrics.  Returns its state
+        (empty if there is none)."""
+        state = self.latest()
+        if state is None:
+            return {}
+        self.wait()
+        self.learner.load(state["path"])
+        if agent is not None and state.get("epsilon") is not None:
+            agent.eps = state["epsilon"]
+        self.learner.metrics.episodes = state["episodes"]
+        self.seq = state["seq"]
+        self._attach()
+        slot = self.seq % self.keep  # already holds exactly these weights
+        for mask in self._pending[slot]:
+            mask[:] = 0
+        self._fresh[slot] = False
+        info(f"[autosave] resumed checkpoint #{self.seq} at episode {state['episodes']}")
+        return state
@@ -0,0 +1,218 @@
+import numpy as np
+
+from board import board
+
+__all__ = ["BatchBoard"]
+
+_U64 = np.uint64
+
+
+class BatchBoard:
+    """N 2048 bit‑boards held in one ``uint64`` NumPy array.
+
+    Every operation is the vectorized counterpart of the scalar `board`
+    method of the same name and produces bit‑identical results; moves use
+    the same 65536‑entry row tables via fancy indexing.
+
+    Ops follow `board.move`: 0=up 1=right 2=down 3=left.  Rewards of
+    illegal moves are -1, as in the scalar API.
+    """
+
+    # views of the `board.lookup` tables, shared by all instances
+    _left: np.ndarray | None = None
+    _right: np.ndarray | None = None
+    _up: np.ndarray | None = None
+    _down: np.ndarray | None = None
+    _score: np.ndarray | None = None
+    _empty_pos: np.ndarray | None = None
+    _empty_count: np.ndarray | None = None
+    _row_moves: np.ndarray | None = None
+    _col_moves: np.ndarray | None = None
+
+    def __init__(
+        self,
+        raw: "np.ndarray | list[int] | int" = 0,
+        n: int | None = None,
+        rng: "np.random.Generator | int | None" = None,
+    ):
+        BatchBoard._tables()
+        if n is not None:
+            self.raw = np.full(n, raw, dtype=_U64)
+        else:
+            self.raw = np.array(raw, dtype=_U64).reshape(-1)
+        self.rng = np.random.default_rng(rng)  # spawn stream (seed or Generator)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getitem__(self, i: int) -> board:
+        return board(int(self.raw[i]))
+
+    @classmethod
+    def _tables(cls) -> None:
+        if cls._left is not None:
+            return
+        board.lookup.init()
+        cls._left = board.lookup.left
+        cls._right = board.lookup.right
+        cls._up = board.lookup.up
+        cls._down = board.lookup.down
+        cls._score = board.lookup.score.astype(np.int64)
+        cls._empty_pos = board.lookup.empty_pos.astype(np.int64)
+        cls._empty_count = board.lookup.empty_count.astype(np.int64)
+        cls._row_moves = board.lookup.row_moves
+        cls._col_moves = board.lookup.col_moves
+
+    # ───────────────────────── tile helpers ───────────────────────────
+
+    def at(self, i: int) -> np.ndarray:
+        """log₂ tile at board index *i* for every board."""
+        return ((self.raw >> _U64(i << 2)) & _U64(0x0F)).astype(np.uint8)
+
+    def tiles(self) -> np.ndarray:
+        """``(N, 16)`` array of log₂ tiles in board index order."""
+        return self.tiles_of(self.raw)
+
+    @staticmethod
+    def tiles_of(raw: np.ndarray) -> np.ndarray:
+        """`tiles` of a ``uint64`` array, without building a batch."""
+        shifts = np.arange(0, 64, 4, dtype=_U64)
+        return ((raw[:, None] >> shifts) & _U64(0x0F)).astype(np.uint8)
+
+    # ───────────────────────── move kernels ───────────────────────────
+
+    @staticmethod
+    def _rows(raw: np.ndarray) -> list[np.ndarray]:
+        return [((raw >> _U64(i << 4)) & _U64(0xFFFF)).astype(np.intp) for i in range(4)]
+
+    @classmethod
+    def _slide(cls, raw: np.ndarray, op: int) -> tuple[np.ndarray, np.ndarray]:
+        """Slide *raw* by *op*; returns ``(after, score)`` without legality."""
+        if op == 1 or op == 3:
+            tbl = cls._right if op == 1 else cls._left
+            rows = cls._rows(raw)
+            after = np.zeros_like(raw)
+            for i, r in enumerate(rows):
+                after |= tbl[r].astype(_U64) << _U64(i << 4)
+        else:
+            tbl = cls._up if op == 0 else cls._down
+            rows = cls._rows(_transpose(raw))
+            after = np.zeros_like(raw)
+            for i, r in enumerate(rows):
+                after |= tbl[r] << _U64(i << 2)
+        score = cls._score[rows[0]] + cls._score[rows[1]] + cls._score[rows[2]] + cls._score[rows[3]]
+        return after, score
+
+    # ────────────────────────── public ops ────────────────────────────
+
+    def move(self, ops: "np.ndarray | int") -> np.ndarray:
+        """Apply ``ops[k]`` to board *k* in place and return the rewards."""
+        ops = np.broadcast_to(np.asarray(ops), self.raw.shape)
+        after = self.raw.copy()
+        score = np.full(self.raw.shape, -1, dtype=np.int64)
+        for op in range(4):
+            sel = np.flatnonzero(ops == op)
+            if sel.size:
+                after[sel], score[sel] = self._slide(self.raw[sel], op)
+        score[after == self.raw] = -1
+        self.raw = after
+        return score
+
+    def afterstates(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All four afterstates per board as ``(after, reward, legal)``.
+
+        Each array has shape ``(N, 4)`` and is indexed ``[board, op]``.
+        Illegal moves carry the unchanged board and reward -1.
+        """
+        return self.afterstates_of(self.raw)
+
+    @classmethod
+    def afterstates_of(cls, raw: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """`afterstates` of a ``uint64`` array, without building a batch
+        (and its spawn RNG)."""
+        cls._tables()
+        raw = np.asarray(raw, dtype=_U64).reshape(-1)
+        after = np.empty((len(raw), 4), dtype=_U64)
+        reward = np.empty((len(raw), 4), dtype=np.int64)
+        for op in range(4):
+            after[:, op], reward[:, op] = cls._slide(raw, op)
+        legal = after != raw[:, None]
+        reward[~legal] = -1
+        return after, reward, legal
+
+    def legal_moves_mask(self) -> np.ndarray:
+        """Per‑board 4‑bit mask of legal ops, from the mobility tables."""
+        mask = np.zeros(len(self.raw), dtype=np.uint8)
+        for r in self._rows(self.raw):
+            mask |= self._row_moves[r]
+        for c in self._rows(_transpose(self.raw)):
+            mask |= self._col_moves[c]
+        return mask
+
+    def can_move(self) -> np.ndarray:
+        return self.legal_moves_mask() != 0
+
+    def popup(self, rng: np.random.Generator | None = None) -> None:
+        """Spawn a 2 (90 %) or 4 (10 %) on a random empty cell of every board
+        that has one.
+
+        Same mechanism as `popup_raw`: per‑row empty tables and a single draw
+        per board picking both the cell and the tile.
+        """
+        rng = self.rng if rng is None else rng
+        rows = self._rows(self.raw)
+        counts = [self._empty_count[r] for r in rows]
+        n = counts[0] + counts[1] + counts[2] + counts[3]
+        live = np.flatnonzero(n)
+        if not live.size:
+            return
+        v = rng.integers(0, n[live] * 10)
+        k, tile = np.divmod(v, 10)
+        tile = np.where(tile == 0, 2, 1).astype(_U64)
+        cell = np.zeros(live.size, dtype=np.int64)
+        for i, (r, c) in enumerate(zip(rows, counts)):
+            r, c = r[live], c[live]
+            hit = (k >= 0) & (k < c)
+            col = (self._empty_pos[r[hit]] >> (k[hit] << 2)) & 0x0F
+            cell[hit] = (i << 2) + col
+            k -= c
+        self.raw[live] |= tile << (cell.astype(_U64) << _U64(2))
+
+    # ───────────────────── board transforms ──────────────────────────
+
+    def transpose(self) -> None:
+        self.raw = _transpose(self.raw)
+
+    def mirror(self) -> None:
+        r = self.raw
+        self.raw = (
+            ((r & _U64(0x000F000F000F000F)) << _U64(12))
+            | ((r & _U64(0x00F000F000F000F0)) << _U64(4))
+            | ((r & _U64(0x0F000F000F000F00)) >> _U64(4))
+            | ((r & _U64(0xF000F000F000F000)) >> _U64(12))
+        )
+
+    def flip(self) -> None:
+        r = self.raw
+        self.raw = (
+            ((r & _U64(0x000000000000FFFF)) << _U64(48))
+            | ((r & _U64(0x00000000FFFF0000)) << _U64(16))
+            | ((r & _U64(0x0000FFFF00000000)) >> _U64(16))
+            | ((r & _U64(0xFFFF000000000000)) >> _U64(48))
+        )
+
+    def clone(self) -> "BatchBoard":
+        return BatchBoard(self.raw.copy(), rng=self.rng)
+
+
+def _transpose(raw: np.ndarray) -> np.ndarray:
+    raw = (
+        (raw & _U64(0xF0F00F0FF0F00F0F))
+        | ((raw & _U64(0x0000F0F00000F0F0)) << _U64(12))
+        | ((raw & _U64(0x0F0F00000F0F0000)) >> _U64(12))
+    )
+    return (
+        (raw & _U64(0xFF00FF0000FF00FF))
+        | ((raw & _U64(0x00000000FF00FF00)) << _U64(24))
+        | ((raw & _U64(0x00FF00FF00000000)) >> _U64(24))
+    )
@@ -0,0 +1,570 @@
+"""Throughput benchmarks for the 2048 hot paths.
+
+Run from ``src/``::
+
+    python bench.py
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from batch import BatchBoard
+from board import board, move_raw, afterstates, popup_raw, legal_moves_mask
+from features import feature, pattern, TupleNetwork
+from sparse import sparse_pattern
+
+# ──────────────────────────── helpers ────────────────────────────────
+
+def corpus(n: int = 4096, seed: int = 2048) -> List[int]:
+    """Fixed set of realistic mid‑game boards (mostly small tiles, some holes)."""
+    rng = random.Random(seed)
+    tiles = (0, 0, 0, 0, 1, 1, 1, 2, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+    return [
+        sum(rng.choice(tiles) << (i << 2) for i in range(16))
+        for _ in range(n)
+    ]
+
+
+def timeit(fn: Callable[[], int], repeat: int = 5) -> float:
+    """Best‑of‑*repeat* ops/sec for *fn*, which returns its op count."""
+    best = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        ops = fn()
+        dt = time.perf_counter() - t0
+        best = max(best, ops / dt)
+    return best
+
+
+def report(label: str, ops_per_sec: float) -> None:
+    print(f"{label:<32}{ops_per_sec:>14,.0f} ops/s")
+
+
+# ──────────────────────────── import board ───────────────────────────
+
+def _import_time(env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import board; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return float(out.stdout)
+
+
+def bench_import(repeat: int = 5) -> None:
+    """Wall time of a fresh ``import board`` with and without the LUT cache."""
+    env = {k: v for k, v in os.environ.items() if k != "BOARD_LUT_CACHE"}
+    best = min(_import_time(env) for _ in range(repeat))
+    print(f"{'import board (build)':<32}{best * 1e3:>11.1f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        env["BOARD_LUT_CACHE"] = os.path.join(tmp, "lut.npy")
+        _import_time(env)  # first import writes the cache
+        best = min(_import_time(env) for _ in range(repeat))
+    print(f"{'import board (mmap cache)':<32}{best * 1e3:>11.1f} ms")
+
+
+def check_env_import() -> None:
+    """Headless ``import env`` must not pull in tkinter."""
+    code = "import sys, env; print('tkinter' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    assert out.stdout.strip() == "False", "env imported tkinter"
+
+
+# ──────────────────────────── board.move ─────────────────────────────
+
+def _rotate_up(b: board) -> int:
+    # previous vertical move: rotate, slide horizontally, rotate back
+    b.rotate_clockwise()
+    score = b.move_right()
+    b.rotate_counterclockwise()
+    return score
+
+
+def _rotate_down(b: board) -> int:
+    b.rotate_clockwise()
+    score = b.move_left()
+    b.rotate_counterclockwise()
+    return score
+
+
+def bench_moves(boards: List[int]) -> None:
+    """Move throughput per direction, plus the old rotate‑based vertical path."""
+    names = ("up", "right", "down", "left")
+    for op in range(4):
+        def run(op=op) -> int:
+            for raw in boards:
+                board(raw).move(op)
+            return len(boards)
+        report(f"move {names[op]}", timeit(run))
+
+    for name, fn in (("up (rotate)", _rotate_up), ("down (rotate)", _rotate_down)):
+        def run(fn=fn) -> int:
+            for raw in boards:
+                fn(board(raw))
+            return len(boards)
+        report(f"move {name}", timeit(run))
+
+
+def bench_raw_moves(boards: List[int]) -> None:
+    """Integer‑level API: four `move_raw` calls vs one `afterstates` call."""
+    def run_moves() -> int:
+        for raw in boards:
+            for op in range(4):
+                move_raw(raw, op)
+        return len(boards)
+
+    def run_after() -> int:
+        for raw in boards:
+            afterstates(raw)
+        return len(boards)
+
+    def run_methods() -> int:
+        for raw in boards:
+            for op in range(4):
+                board(raw).move(op)
+        return len(boards)
+
+    report("4 afterstates (board.move)", timeit(run_methods))
+    report("4 afterstates (move_raw)", timeit(run_moves))
+    report("4 afterstates (afterstates)", timeit(run_after))
+
+
+def bench_can_move(boards: List[int]) -> None:
+    """Game‑over checks per second: mobility tables vs simulating 4 moves."""
+    def run_mask() -> int:
+        for raw in boards:
+            legal_moves_mask(raw) != 0
+        return len(boards)
+
+    def run_sim() -> int:
+        for raw in boards:
+            any(move_raw(raw, op)[1] != -1 for op in range(4))
+        return len(boards)
+
+    report("can_move (mobility tables)", timeit(run_mask))
+    report("can_move (simulate moves)", timeit(run_sim))
+
+
+def bench_popup(boards: List[int]) -> None:
+    """Tile spawns per second: seeded `popup_raw` vs `board.popup`."""
+    rng = random.Random(0)
+
+    def run_raw() -> int:
+        for raw in boards:
+            popup_raw(raw, rng)
+        return len(boards)
+
+    def run_board() -> int:
+        for raw in boards:
+            board(raw, rng).popup()
+        return len(boards)
+
+    report("popup_raw", timeit(run_raw))
+    report("board.popup", timeit(run_board))
+
+
+# ──────────────────────────── pattern ────────────────────────────────
+
+TUPLES = [                 # the 4×6‑tuple network from Train.ipynb
+    [0, 1, 2, 3, 4, 5],
+    [4, 5, 6, 7, 8, 9],
+    [0, 1, 2, 4, 5, 6],
+    [4, 5, 6, 8, 9, 10],
+]
+
+
+def bench_pattern(boards: List[int], feat: pattern | None = None) -> None:
+    """`pattern.estimate` / `pattern.update` calls per second (8 isomorphisms)."""
+    feat = pattern(TUPLES[0]) if feat is None else feat
+
+    def run_estimate() -> int:
+        for raw in boards:
+            feat.estimate(raw)
+        return len(boards)
+
+    def run_update() -> int:
+        for raw in boards:
+            feat.update(raw, 0.0)
+        return len(boards)
+
+    report("pattern.estimate", timeit(run_estimate))
+    report("pattern.update", timeit(run_update))
+
+
+def bench_radix(boards: List[int], radixes=(16, 13, 12)) -> None:
+    """Table size and `pattern.estimate` speed of a 6‑tuple per cell radix."""
+    for radix in radixes:
+        feat = pattern(TUPLES[0], radix=radix)
+
+        def run(feat=feat) -> int:
+            for raw in boards:
+                feat.estimate(raw)
+            return len(boards)
+
+        report(f"estimate base {radix} ({feat.nbytes() >> 20} MiB)", timeit(run))
+        feature.free(feat.weight)
+
+
+def bench_network(boards: List[int]) -> None:
+    """Value of the 4×6‑tuple network: per‑feature sum vs `TupleNetwork`."""
+    feats = [pattern(t) for t in TUPLES]
+    net = TupleNetwork(feats)
+
+    def run_sum() -> int:
+        for raw in boards:
+            sum(f.estimate(raw) for f in feats)
+        return len(boards)
+
+    def run_net() -> int:
+        for raw in boards:
+            net.estimate(raw)
+        return len(boards)
+
+    def run_td() -> int:
+        for raw in boards:
+            net.estimate_and_update(raw, 0.0, 0.0)
+        return len(boards)
+
+    report("V() sum of patterns", timeit(run_sum))
+    report("V() TupleNetwork", timeit(run_net))
+    report("TupleNetwork.estimate_and_update", timeit(run_td))
+
+
+def bench_pattern_batch(boards: List[int], sizes=(1_000, 100_000)) -> None:
+    """Boards per second through `estimate_batch` / `update_batch` vs the
+    scalar `pattern.estimate` loop."""
+    feat = pattern(TUPLES[0])
+    rng = np.random.default_rng(0)
+    src = np.array(boards, dtype=np.uint64)
+    for n in sizes:
+        raws = src[rng.integers(0, len(src), n)]
+        deltas = np.zeros(n, dtype=np.float32)
+        scalar = raws.tolist()
+        report(f"estimate_batch N={n:,}", timeit(lambda: len(feat.estimate_batch(raws))))
+        report(f"update_batch N={n:,}", timeit(lambda: len(feat.update_batch(raws, deltas))))
+        report(f"estimate loop N={n:,}", timeit(lambda: len([feat.estimate(r) for r in scalar]), repeat=1))
+
+
+def bench_sparse(boards: List[int]) -> None:
+    """Dense vs hashed 6‑tuple, plus an 8‑tuple that only fits hashed."""
+    for label, feat in (
+        ("dense 6-tuple", pattern(TUPLES[0])),
+        ("sparse 6-tuple", sparse_pattern(TUPLES[0])),
+        ("sparse 8-tuple", sparse_pattern([0, 1, 2, 3, 4, 5, 6, 7], budget=64 << 20)),
+    ):
+        def run_update(feat=feat) -> int:
+            for raw in boards:
+                feat.update(raw, 1.0)
+            return len(boards)
+
+        def run_estimate(feat=feat) -> int:
+            for raw in boards:
+                feat.estimate(raw)
+            return len(boards)
+
+        report(f"{label} update", timeit(run_update))
+        report(f"{label} estimate", timeit(run_estimate))
+        print(f"{'':<32}{feat.nbytes() / 2**20:>11.1f} MiB")
+
+
+# ──────────────────────────── TD step ────────────────────────────────
+
+def bench_td_step(episodes: int = 20, seed: int = 1) -> None:
+    """Network index computations (full estimates) and value reads per env
+    step of `RLAgent` training, with and without the afterstate cache."""
+    from agent import RLAgent
+    from env import Game2048Env
+    from learners import FeatureTD0Learner
+
+    for cached in (False, True):
+        random.seed(seed)
+        ln = FeatureTD0Learner()
+        for t in TUPLES:
+            ln.add_feature(pattern(t))
+        net = ln.network()
+        counts = {"indices": 0, "gather": 0, "steps": 0}
+
+        def counted(fn, key):
+            def wrapper(*args, **kw):
+                counts[key] += 1
+                return fn(*args, **kw)
+            return wrapper
+
+        net.indices = counted(net.indices, "indices")
+        net.gather = counted(net.gather, "gather")
+        select, update = ln.select_action, ln.update
+
+        def select_action(s, eps):
+            if not cached:
+                ln._cache = None
+            return select(s, eps)
+
+        def step_update(*args):
+            if not cached:
+                ln._cache = None
+            counts["steps"] += 1
+            update(*args)
+
+        ln.select_action, ln.update = select_action, step_update
+        agent = RLAgent(Game2048Env(seed=seed), ln)
+        t0 = time.perf_counter()
+        for _ in range(episodes):
+            agent.run_episode()
+        dt = time.perf_counter() - t0
+        label = "cached" if cached else "uncached"
+        steps = counts["steps"]
+        print(f"{'TD step (' + label + ')':<32}{counts['indices'] / steps:>8.2f} estimates/step"
+              f"{counts['gather'] / steps:>8.2f} reads/step{steps / dt:>10,.0f} steps/s")
+        for t in ln.features:
+            feature.free(t.weight)
+
+
+def bench_replay(episodes: int = 20, seed: int = 1) -> None:
+    """Training steps per second: online TD(0) vs backward‑replay TD(λ)."""
+    from agent import RLAgent
+    from env import Game2048Env
+    from learners import FeatureTD0Learner, FeatureTDLambdaLearner
+
+    for label, ln in (
+        ("online TD(0)", FeatureTD0Learner()),
+        ("replay TD(0.5)", FeatureTDLambdaLearner(lam=0.5)),
+        ("replay 4-step", FeatureTDLambdaLearner(n_step=4)),
+    ):
+        random.seed(seed)
+        for t in TUPLES:
+            ln.add_feature(pattern(t))
+        env = Game2048Env(seed=seed)
+        agent = RLAgent(env, ln)
+        steps, step = 0, env.step
+
+        def counted_step(action: int):
+            nonlocal steps
+            steps += 1
+            return step(action)
+
+        env.step = counted_step
+        t0 = time.perf_counter()
+        for _ in range(episodes):
+            agent.run_episode()
+        report(f"train steps ({label})", steps / (time.perf_counter() - t0))
+        for f in ln.features:
+            feature.free(f.weight)
+
+
+def bench_parallel(workers=(1, 2, 4, 8, 16), episodes: int = 64) -> None:
+    """Hogwild `ParallelTrainer` scaling: episodes/sec per worker count."""
+    from parallel import ParallelTrainer
+
+    for k in workers:
+        trainer = ParallelTrainer(TUPLES, workers=k, seed=k)
+        rate = trainer.train(max(episodes, 4 * k), unit=1 << 62)
+        trainer.close()
+        print(f"{f'parallel train ({k} workers)':<32}{rate:>14,.1f} episodes/s")
+
+
+def bench_vector_env(sizes=(64, 1024), steps: int = 2000) -> None:
+    """Greedy play steps/sec: `Game2048Env` + `select_action` vs
+    `VectorGame2048Env` + batched `select_actions`."""
+    from env import Game2048Env, VectorGame2048Env
+    from learners import FeatureTD0Learner
+
+    ln = FeatureTD0Learner()
+    for t in TUPLES:
+        ln.add_feature(pattern(t))
+
+    env = Game2048Env(seed=0)
+    state = env.reset()
+
+    def run_scalar() -> int:
+        nonlocal state
+        for _ in range(steps):
+            state, _, done, _ = env.step(ln.select_action(state, 0.0))
+            if done:
+                state = env.reset()
+        return steps
+
+    report("env steps (scalar)", timeit(run_scalar, repeat=3))
+    for n in sizes:
+        venv = VectorGame2048Env(n, seed=0)
+        states = venv.reset()
+        reps = max(1, steps // n)
+
+        def run_vector() -> int:
+            nonlocal states
+            for _ in range(reps):
+                states, _, _, _ = venv.step(ln.select_actions(states, rng=venv.rng))
+            return n * reps
+
+        report(f"env steps (vector n={n:,})", timeit(run_vector, repeat=3))
+    for f in ln.features:
+        feature.free(f.weight)
+
+
+# ──────────────────────────── search ─────────────────────────────────
+
+def bench_search(boards: List[int], depth: int = 3) -> None:
+    """Expectimax nodes/sec and transposition‑table hit rate, raw vs
+    symmetry‑canonical keys."""
+    from learners import FeatureTD0Learner
+    from search import ExpectimaxAgent
+
+    ln = FeatureTD0Learner()
+    for t in TUPLES:
+        ln.add_feature(pattern(t))
+    for canon in (False, True):
+        agent = ExpectimaxAgent(ln, depth=depth, canonical=canon)
+        for raw in boards:
+            agent.select_action(raw)
+        st = agent.stats()
+        label = f"expectimax d={depth}" + (" canonical" if canon else "")
+        print(f"{label:<32}{st['nodes_per_sec']:>14,.0f} nodes/s  hit rate {st['tt_hit_rate']:.1%}")
+    for f in ln.features:
+        feature.free(f.weight)
+
+
+# ──────────────────────────── checkpoints ────────────────────────────
+
+def check_legacy_pickle(boards: List[int], seed: int = 0) -> None:
+    """`FeatureTD0Learner.load` reads pickles from before NumPy tables
+    (``weight`` a Python list, no radix / index plans) and plays with them."""
+    import pickle
+    from learners import FeatureTD0Learner
+
+    rng = random.Random(seed)
+    p = pattern([0, 1, 2, 3, 4, 5])
+    for _ in range(10_000):
+        p.weight[rng.randrange(p.size())] = rng.random()
+    legacy = object.__new__(pattern)  # the state the original pattern pickled
+    legacy.__dict__.update(isom=p.isom, weight=p.weight.tolist())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "feat_td0.pkl")
+        with open(path, "wb") as f:
+            pickle.dump([legacy], f)
+        ln = FeatureTD0Learner()
+        ln.load(path)
+    loaded = ln.features[0]
+    assert isinstance(loaded.weight, np.ndarray) and loaded.weight.dtype == np.float32
+    for raw in boards[:500]:
+        assert ln.value(raw) == p.estimate(raw), hex(raw)
+        ln.select_action(raw, 0.0)
+    for f in (p, loaded):
+        feature.free(f.weight)
+
+
+def check_reload(boards: List[int]) -> None:
+    """Loading a checkpoint into a learner that already holds its 4×6 TC
+    tables (a resume) hands the old tables back to the `feature.alloc`
+    budget instead of charging 768 MiB twice; mapped loads charge nothing."""
+    from learners import FeatureTCLearner
+
+    start = getattr(feature.alloc, "total", 0)
+    ln = FeatureTCLearner()
+    for t in TUPLES:
+        ln.add_feature(pattern(t))
+    ln.select_action(boards[0], 0.0)  # fuse the network
+    tables = 3 * len(TUPLES) * (64 << 20)  # weights, E and A
+    assert feature.alloc.total == start + tables
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tc.bin")
+        ln.save(path)
+        for mode in (None, None, "r", None):
+            ln.load(path, mmap_mode=mode)
+            assert feature.alloc.total == start + (tables if mode is None else 0), mode
+            ln.select_action(boards[0], 0.0)
+        for f in ln.features:
+            f.release()
+    assert feature.alloc.total == start
+
+
+# ──────────────────────────── BatchBoard ─────────────────────────────
+
+def check_batch(boards: List[int], seed: int = 0) -> None:
+    """Randomized bit‑for‑bit equivalence of `BatchBoard` against `board`."""
+    rng = random.Random(seed)
+    batch = BatchBoard(boards)
+    after, reward, legal = batch.afterstates()
+    for k, raw in enumerate(boards):
+        for op, res in enumerate(afterstates(raw)):
+            assert (int(after[k, op]), int(reward[k, op]), bool(legal[k, op])) == res, hex(raw)
+
+    ops = np.array([rng.randrange(4) for _ in boards])
+    moved = batch.clone()
+    rewards = moved.move(ops)
+    for k, raw in enumerate(boards):
+        assert (int(moved.raw[k]), int(rewards[k])) == move_raw(raw, int(ops[k])), hex(raw)
+
+    alive = batch.can_move()
+    masks = batch.legal_moves_mask()
+    for k, raw in enumerate(boards):
+        assert bool(alive[k]) == board(raw).can_move(), hex(raw)
+        assert int(masks[k]) == legal_moves_mask(raw), hex(raw)
+
+    for name in ("transpose", "mirror", "flip"):
+        moved = batch.clone()
+        getattr(moved, name)()
+        for k, raw in enumerate(boards):
+            b = board(raw)
+            getattr(b, name)()
+            assert int(moved.raw[k]) == b.raw, (name, hex(raw))
+
+
+def bench_batch(boards: List[int], sizes=(1, 1_000, 100_000)) -> None:
+    """Boards moved per second by `BatchBoard` at several batch sizes."""
+    rng = np.random.default_rng(0)
+    src = np.array(boards, dtype=np.uint64)
+    for n in sizes:
+        batch = BatchBoard(src[rng.integers(0, len(src), n)])
+        ops = rng.integers(0, 4, n)
+        reps = max(1, 10_000 // n)
+
+        def run_move() -> int:
+            for _ in range(reps):
+                batch.clone().move(ops)
+            return n * reps
+
+        def run_after() -> int:
+            for _ in range(reps):
+                batch.afterstates()
+            return n * reps
+
+        def run_popup() -> int:
+            for _ in range(reps):
+                batch.clone().popup()
+            return n * reps
+
+        report(f"batch move N={n:,}", timeit(run_move))
+        report(f"batch afterstates N={n:,}", timeit(run_after))
+        report(f"batch popup N={n:,}", timeit(run_popup))
+
+
+if __name__ == "__main__":
+    bench_import()
+    check_env_import()
+    boards = corpus()
+    bench_moves(boards)
+    bench_raw_moves(boards)
+    bench_can_move(boards)
+    bench_popup(boards)
+    bench_pattern(boards)
+    bench_radix(boards)
+    bench_network(boards)
+    bench_pattern_batch(boards)
+    bench_sparse(boards)
+    bench_td_step()
+    bench_replay()
+    bench_parallel()
+    bench_vector_env()
+    bench_search(boards[:50])
+    check_legacy_pickle(boards)
+    check_reload(boards)
+    check_batch(boards)
+    bench_batch(boards)
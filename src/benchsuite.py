@@ -0,0 +1,264 @@
+"""Regression benchmark suite for the training hot paths.
+
+Every case runs on fixed inputs (the seeded `bench.corpus` boards, seeded
+transitions and games), is warmed up, then timed over several repetitions;
+the median ops/sec is the result.  Results are written as JSON and can be
+compared against a stored baseline.  Run from ``src/``::
+
+    python benchsuite.py --out base.json                       # record a baseline
+    python benchsuite.py --baseline base.json --threshold 0.1  # check a change
+    python benchsuite.py --baseline base.json --limit episode_4x6=0.2 --only board
+
+The exit status is 1 if any case is slower than the baseline by more than
+its threshold (default 10 %, per case with ``--limit name=fraction``).
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+from agent import RLAgent
+from bench import corpus, TUPLES
+from board import board
+from env import Game2048Env
+from features import feature, pattern
+from learners import FeatureTD0Learner
+
+__all__ = ["CASES", "run", "compare"]
+
+SEED = 2048
+
+
+# ──────────────────────────── fixtures ───────────────────────────────
+
+def _transitions(n: int = 4096, seed: int = SEED) -> list[tuple[int, int, int, int, bool]]:
+    """Fixed ``(s, a, r, s_next, done)`` steps from seeded random play."""
+    env = Game2048Env(seed=seed)
+    rng = random.Random(seed)
+    out, s = [], env.reset()
+    while len(out) < n:
+        a = rng.randrange(4)
+        s_next, r, done, info = env.step(a)
+        if not info["illegal"]:
+            out.append((s, a, r, s_next, done))
+        s = env.reset() if done else s_next
+    return out
+
+
+_owned: list[feature] = []  # tables of the running case, freed after it
+
+
+def _pattern(t: list[int]) -> pattern:
+    _owned.append(pattern(t))
+    return _owned[-1]
+
+
+def _learner() -> FeatureTD0Learner:
+    ln = FeatureTD0Learner(alpha=0.0025)
+    for t in TUPLES:
+        ln.add_feature(_pattern(t))
+    return ln
+
+
+def _release() -> None:
+    while _owned:
+        feature.free(_owned.pop().weight)
+
+
+# ──────────────────────────── cases ──────────────────────────────────
+# Each case builds its fixture and returns a callable doing one timed
+# repetition and returning the number of operations it performed.  A
+# ``reset`` attribute on it, if set, is called untimed before every run.
+
+def case_board_move(boards: list[int]) -> Callable[[], int]:
+    def run() -> int:
+        for raw in boards:
+            for op in range(4):
+                board(raw).move(op)
+        return 4 * len(boards)
+    return run
+
+
+def case_board_can_move(boards: list[int]) -> Callable[[], int]:
+    def run() -> int:
+        for raw in boards:
+            board(raw).can_move()
+        return len(boards)
+    return run
+
+
+def case_board_popup(boards: list[int]) -> Callable[[], int]:
+    def run() -> int:
+        rng = random.Random(SEED)
+        for raw in boards:
+            board(raw, rng).popup()
+        return len(boards)
+    return run
+
+
+def case_pattern_estimate(boards: list[int]) -> Callable[[], int]:
+    feat = _pattern(TUPLES[0])
+    def run() -> int:
+        for raw in boards:
+            feat.estimate(raw)
+        return len(boards)
+    return run
+
+
+def case_pattern_update(boards: list[int]) -> Callable[[], int]:
+    feat = _pattern(TUPLES[0])
+    def run() -> int:
+        for raw in boards:
+            feat.update(raw, 0.0)
+        return len(boards)
+    return run
+
+
+def case_select_action(boards: list[int]) -> Callable[[], int]:
+    ln = _learner()
+    def run() -> int:
+        for raw in boards:
+            ln._cache = None  # measure the full evaluation, not cache hits
+            ln.select_action(raw, 0.0)
+        return len(boards)
+    return run
+
+
+def case_learner_update(boards: list[int]) -> Callable[[], int]:
+    ln = _learner()
+    steps = _transitions()
+    def run() -> int:
+        for s, a, r, s_next, done in steps:
+            ln.update(s, a, r, s_next, None, done)
+        return len(steps)
+    return run
+
+
+def case_episode_4x6(boards: list[int], episodes: int = 5) -> Callable[[], int]:
+    """End to end: training episodes/sec with the Train.ipynb 4×6‑tuple network.
+
+    The weights are zeroed before every repetition, so each one plays the
+    same games (training on would change their length from run to run)."""
+    ln = _learner()
+    env = Game2048Env()
+    agent = RLAgent(env, ln, epsilon=0.01, decay=1.0)
+    def reset() -> None:
+        for f in ln.features:
+            f.weight.fill(0)
+        ln._cache = None
+    def run() -> int:
+        random.seed(SEED)
+        env.seed(SEED)
+        for _ in range(episodes):
+            agent.run_episode()
+        return episodes
+    run.reset = reset
+    return run
+
+
+CASES: dict[str, Callable[[list[int]], Callable[[], int]]] = {
+    "board_move": case_board_move,
+    "board_can_move": case_board_can_move,
+    "board_popup": case_board_popup,
+    "pattern_estimate": case_pattern_estimate,
+    "pattern_update": case_pattern_update,
+    "learner_select_action": case_select_action,
+    "learner_update": case_learner_update,
+    "episode_4x6": case_episode_4x6,
+}
+
+
+# ──────────────────────────── runner ─────────────────────────────────
+
+def measure(fn: Callable[[], int], warmup: int = 1, repeat: int = 5) -> dict:
+    reset = getattr(fn, "reset", None) or (lambda: None)
+    for _ in range(warmup):
+        reset()
+        fn()
+    rates = []
+    for _ in range(repeat):
+        reset()
+        t0 = time.perf_counter()
+        ops = fn()
+        rates.append(ops / (time.perf_counter() - t0))
+    return {
+        "ops_per_sec": statistics.median(rates),
+        "best": max(rates),
+        "stdev": statistics.stdev(rates) if len(rates) > 1 else 0.0,
+        "runs": rates,
+    }
+
+
+def run(only: list[str] | None = None, warmup: int = 1, repeat: int = 5) -> dict:
+    """Run the (selected) cases; returns the JSON‑ready result document."""
+    boards = corpus(seed=SEED)
+    results = {}
+    for name, make in CASES.items():
+        if only and not any(name.startswith(p) for p in only):
+            continue
+        results[name] = measure(make(boards), warmup, repeat)
+        print(f"{name:<28}{results[name]['ops_per_sec']:>14,.0f} ops/s", file=sys.stderr)
+        _release()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": SEED,
+            "warmup": warmup,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(new: dict, base: dict, threshold: float = 0.1, limits: dict[str, float] | None = None) -> list[str]:
+    """Names of cases slower than *base* by more than their threshold."""
+    limits = limits or {}
+    failed = []
+    for name, res in new["results"].items():
+        if name not in base["results"]:
+            continue
+        old = base["results"][name]["ops_per_sec"]
+        ratio = res["ops_per_sec"] / old
+        limit = limits.get(name, threshold)
+        bad = ratio < 1.0 - limit
+        print(f"{name:<28}{old:>14,.0f} → {res['ops_per_sec']:>14,.0f}  {ratio - 1:+7.1%}"
+              f"{'  REGRESSION' if bad else ''}")
+        if bad:
+            failed.append(name)
+    return failed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare against this results JSON")
+    ap.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown (fraction)")
+    ap.add_argument("--limit", action="append", default=[], metavar="NAME=FRACTION",
+                    help="per-case threshold override")
+    ap.add_argument("--only", nargs="*", help="case name prefixes to run")
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    res = run(args.only, args.warmup, args.repeat)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(res, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        limits = {k: float(v) for k, v in (s.split("=", 1) for s in args.limit)}
+        return 1 if compare(res, base, args.threshold, limits) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""Zero‑copy binary checkpoints for n‑tuple weight tables.
+
+File layout (all integers little‑endian)::
+
+    magic    8 bytes   b"N2048WT\\0"
+    version  uint32
+    hlen     uint32    length of the JSON header that follows
+    header   hlen bytes of UTF‑8 JSON
+    padding  up to the next `PAGE` boundary
+    data     every feature's weight table, back to back, then the other
+             blobs (keys, visits, TC accumulators), each `ALIGN`‑aligned
+
+The header lists every feature's ``kind``, ``name``, ``tuple``, ``iso``
+count, ``radix``, ``dtype``, ``size`` and byte ``offset`` (relative to the
+data section), plus a free‑form ``meta`` dict for learner settings.
+Sparse features store their compacted values there and list their key /
+visit arrays under ``blobs``; they are always read into memory.  Patterns
+with temporal‑coherence accumulators list ``tc_e`` / ``tc_a`` blobs the
+same way (mapped along with the weights).  Quantized features add their
+``scale``.  Because the data section is page aligned and the weight tables
+are packed without gaps, `load_features` can memory‑map all of them as
+one array that `TupleNetwork` adopts: read‑only maps let evaluation
+workers share one page‑cache copy, ``"r+"`` maps let training write
+straight into the file.
+"""
+import json
+import os
+import struct
+import typing
+
+import numpy as np
+
+from features import feature, pattern, quantized_pattern
+from sparse import sparse_pattern
+
+__all__ = ["is_checkpoint", "read_header", "layout", "save_features", "load_features"]
+
+MAGIC = b"N2048WT\0"
+VERSION = 1
+PAGE = 4096   # data section alignment (mmap friendly)
+ALIGN = 64    # per‑blob alignment (cache line)
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _align(n: int, a: int) -> int:
+    return (n + a - 1) // a * a
+
+
+# ──────────────────────────── header ─────────────────────────────────
+
+def is_checkpoint(path: str) -> bool:
+    """True if *path* starts with the checkpoint magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_header(path: str) -> tuple[dict, int]:
+    """Return ``(header, data_start)`` of the checkpoint at *path*."""
+    with open(path, "rb") as f:
+        magic, version, hlen = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"not a weight checkpoint: {path}")
+        if version > VERSION:
+            raise ValueError(f"unsupported checkpoint version {version}: {path}")
+        header = json.loads(f.read(hlen).decode("utf-8"))
+    return header, _align(_PREAMBLE.size + hlen, PAGE)
+
+
+def _blobs(f: feature) -> list[tuple[str, np.ndarray]]:
+    """Arrays to store for *f*; the first (``weight``) is the primary one."""
+    if isinstance(f, sparse_pattern):
+        keys, values, visits = f.weight.items()
+        return [("weight", values), ("keys", keys), ("visits", visits)]
+    if isinstance(f, pattern):
+        if f.tc_e is not None:
+            return [("weight", f.weight), ("tc_e", f.tc_e), ("tc_a", f.tc_a)]
+        return [("weight", f.weight)]
+    raise TypeError(f"cannot checkpoint feature type {type(f).__name__}")
+
+
+def _kind(f: feature) -> str:
+    if isinstance(f, sparse_pattern):
+        return "sparse_pattern"
+    if isinstance(f, quantized_pattern):
+        return "quantized_pattern"
+    return "pattern"
+
+
+def _describe(f: feature, blobs: dict[str, dict]) -> dict:
+    entry = {
+        "kind": _kind(f),
+        "name": f.name(),
+        "tuple": list(f.isom[0]),
+        "iso": len(f.isom),
+        "radix": f.radix,
+        **blobs.pop("weight"),
+    }
+    if blobs:
+        entry["blobs"] = blobs
+    if isinstance(f, sparse_pattern):
+        t = f.weight
+        entry.update(capacity=t.capacity, budget=t.budget, eviction=t.eviction)
+    if isinstance(f, quantized_pattern):
+        entry["scale"] = f.scale
+    return entry
+
+
+# ──────────────────────────── save / load ────────────────────────────
+
+def layout(
+    features: typing.Sequence[feature], meta: dict | None = None
+) -> tuple[bytes, int, list[list[tuple[int, np.ndarray]]], int]:
+    """File layout of *features*: ``(header, data_start, blobs, end)``.
+
+    *header* is the encoded preamble plus JSON header, *blobs* lists every
+    feature's stored arrays (weight first) with their absolute file
+    positions and *end* is the file size.  `save_features` writes exactly
+    this; `autosave` rewrites parts of the blobs in place.
+    """
+    stored = [_blobs(f) for f in features]
+    places: list[dict[str, tuple[int, np.ndarray]]] = [{} for _ in features]
+    offset = 0
+    for place, ((name, a), *_) in zip(places, stored):  # weights back to back
+        place[name] = (offset, a)
+        offset += a.nbytes
+    for place, (_, *extra) in zip(places, stored):
+        for name, a in extra:
+            offset = _align(offset, ALIGN)
+            place[name] = (offset, a)
+            offset += a.nbytes
+    entries = [
+        _describe(f, {name: {"dtype": a.dtype.str, "size": len(a), "offset": pos}
+                      for name, (pos, a) in place.items()})
+        for f, place in zip(features, places)
+    ]
+    header = json.dumps({"version": VERSION, "features": entries, "meta": meta or {}}).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header), PAGE)
+    preamble = _PREAMBLE.pack(MAGIC, VERSION, len(header)) + header
+    blobs = [[(data_start + pos, a) for pos, a in place.values()] for place in places]
+    return preamble, data_start, blobs, data_start + offset
+
+
+def save_features(path: str, features: typing.Sequence[feature], meta: dict | None = None) -> None:
+    """Write *features* (and *meta*) to *path*, atomically via a temp file."""
+    header, _, blobs, end = layout(features, meta)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(header)
+        for pos, a in (b for feature_blobs in blobs for b in feature_blobs):
+            out.seek(pos)
+            np.ascontiguousarray(a).tofile(out)  # no intermediate bytes copy
+        out.truncate(end)
+    os.replace(tmp, path)
+
+
+def load_features(
+    path: str, mmap_mode: str | None = None
+) -> tuple[list[feature], np.ndarray | None, dict]:
+    """Load the features stored at *path*.
+
+    *mmap_mode* is ``None`` (read into fresh in‑process tables), ``"r"``
+    (shared read‑only map), ``"r+"`` (read‑write map: updates go to the
+    file) or ``"c"`` (private copy‑on‑write map).
+
+    Returns ``(features, weight, meta)``.  When the blobs are contiguous and
+    share a dtype they are loaded (or mapped) as one array, *weight*, that
+    the features' tables are views of (hand it to `TupleNetwork`);
+    otherwise *weight* is None.
+    """
+    header, data_start = read_header(path)
+    entries = header["features"]
+    contiguous = (
+        all(e["kind"] == "pattern" for e in entries)
+        and len({e["dtype"] for e in entries}) == 1
+        and all(
+            b["offset"] == a["offset"] + a["size"] * np.dtype(a["dtype"]).itemsize
+            for a, b in zip(entries, entries[1:])
+        )
+    )
+
+    if contiguous and entries:
+        dtype = np.dtype(entries[0]["dtype"])
+        total = sum(e["size"] for e in entries)
+        start = data_start + entries[0]["offset"]
+        if mmap_mode is None:
+            weight = feature.alloc(total, dtype)
+            _read_into(path, start, weight)
+        else:
+            weight = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=start, shape=(total,))
+        features, first = [], 0
+        for e in entries:
+            f = _build(e, weight[first : first + e["size"]])
+            _load_tc(f, path, data_start, e, mmap_mode)
+            features.append(f)
+            first += e["size"]
+        return features, weight, header.get("meta", {})
+
+    features = []
+    for e in entries:
+        dtype = np.dtype(e["dtype"])
+        start = data_start + e["offset"]
+        if e["kind"] == "sparse_pattern":
+            f = _build_sparse(path, data_start, e)
+        elif mmap_mode is None:
+            f = _build(e, None)
+            _read_into(path, start, f.weight)
+        else:
+            f = _build(e, np.memmap(path, dtype=dtype, mode=mmap_mode, offset=start, shape=(e["size"],)))
+        _load_tc(f, path, data_start, e, mmap_mode)
+        features.append(f)
+    return features, None, header.get("meta", {})
+
+
+def _read_into(path: str, start: int, weight: np.ndarray) -> None:
+    with open(path, "rb") as src:
+        src.seek(start)
+        if src.readinto(memoryview(weight).cast("B")) != weight.nbytes:
+            raise ValueError(f"truncated checkpoint: {path}")
+
+
+def _read_blob(path: str, data_start: int, blob: dict) -> np.ndarray:
+    a = np.empty(blob["size"], dtype=np.dtype(blob["dtype"]))
+    _read_into(path, data_start + blob["offset"], a)
+    return a
+
+
+def _load_blob(path: str, data_start: int, blob: dict, mmap_mode: str | None) -> np.ndarray:
+    if mmap_mode is None:
+        a = feature.alloc(blob["size"], np.dtype(blob["dtype"]))
+        _read_into(path, data_start + blob["offset"], a)
+        return a
+    return np.memmap(path, dtype=np.dtype(blob["dtype"]), mode=mmap_mode,
+                     offset=data_start + blob["offset"], shape=(blob["size"],))
+
+
+def _load_tc(f: feature, path: str, data_start: int, e: dict, mmap_mode: str | None) -> None:
+    if "tc_e" in e.get("blobs", {}):
+        f.tc_e, f.tc_a = (_load_blob(path, data_start, e["blobs"][k], mmap_mode) for k in ("tc_e", "tc_a"))
+
+
+def _build_sparse(path: str, data_start: int, e: dict) -> sparse_pattern:
+    f = sparse_pattern(e["tuple"], iso=e["iso"], dtype=np.dtype(e["dtype"]),
+                       capacity=e["capacity"], budget=e["budget"], eviction=e["eviction"])
+    values = _read_blob(path, data_start, e)
+    keys = _read_blob(path, data_start, e["blobs"]["keys"])
+    visits = _read_blob(path, data_start, e["blobs"]["visits"])
+    f.weight.load_items(keys, values, visits)
+    return f
+
+
+def _build(e: dict, weight: np.ndarray | None) -> feature:
+    args = dict(iso=e["iso"], dtype=np.dtype(e["dtype"]), weight=weight, radix=e.get("radix", 16))
+    if e["kind"] == "pattern":
+        return pattern(e["tuple"], **args)
+    if e["kind"] == "quantized_pattern":
+        return quantized_pattern(e["tuple"], scale=e["scale"], **args)
+    raise ValueError(f"unknown feature kind {e['kind']!r}")
@@ -1,6 +1,9 @@
 import random
-from board import board
-from gui_render import BoardView
+
+import numpy as np
+
+from batch import BatchBoard
+from board import board, move_raw, can_move_raw
 
 def _ascii_render(raw_value: int) -> None: #console debugging
     tiles = [(raw_value >> (4 * i)) & 0xF for i in range(16)]
@@ -15,17 +18,24 @@ class Game2048Env:
         self,
         seed: int | None = None,
         ascii_render: bool = False,
-        gui: bool = False
+        gui: bool = False,
+        fps: int = 30,
     ):
-        if seed is not None:
-            random.seed(seed)
-
-        self.b = board()                      # your 2048 bitboard
+        # per‑env RNG stream: spawns and sample_move() never touch the global
+        # `random` module, so parallel envs reproduce games from their seeds
+        self.rng = random.Random()
+        self.seed(seed)
+        self.b = board(rng=self.rng)          # your 2048 bitboard
         self.num_moves = len(self.ACTIONS)
 
         # Rendering switches
         self._ascii = ascii_render
-        self._gui_view = BoardView() if gui else None
+        self._gui_view = None
+        if gui:
+            # tkinter only loads when asked for; frames go to a renderer
+            # thread so drawing never blocks the training loop
+            from gui_render import AsyncBoardView
+            self._gui_view = AsyncBoardView(fps=fps)
 
     def _maybe_render(self):
         if self._ascii:
@@ -33,24 +43,102 @@ class Game2048Env:
         if self._gui_view:
             self._gui_view.draw(self.b.raw)
 
-    def reset(self):
+    def seed(self, seed: int | None = None) -> None:
+        """Reseed this env's RNG stream.  Without *seed* the stream is drawn
+        from the global `random` module, so ``random.seed(n)`` still
+        reproduces the games of unseeded envs."""
+        self.rng.seed(random.getrandbits(64) if seed is None else seed)
+
+    def reset(self, seed: int | None = None):
+        if seed is not None:
+            self.seed(seed)
         self.b.reset()
         self._maybe_render()
         return self.b.raw
 
     def step(self, action: int) -> tuple[int, int, bool, dict]:
-        reward = self.b.move(action)
+        self.b.raw, reward = move_raw(self.b.raw, action)
         illegal = (reward == -1)
         if illegal:
             reward = 0
         else:
             self.b.popup()     # only add a tile on valid moves
-        done = not self.b.can_move()
+        done = not can_move_raw(self.b.raw)
         self._maybe_render()
         return self.b.raw, reward, done, {"illegal": illegal}
 
     def sample_move(self) -> int:
-        return random.choice(self.ACTIONS)
+        return self.rng.choice(self.ACTIONS)
 
     def render(self):
-        self._maybe_render()
\ No newline at end of file
+        self._maybe_render()
+
+
+class VectorGame2048Env:
+    """*n* games stepped in lock‑step over one `BatchBoard`.
+
+    ``step(actions)`` takes one action per game and returns arrays
+    ``(states, rewards, done, info)``.  Finished games are reset on the
+    spot, so *states* already holds their new opening boards; their last
+    board is ``info["final_state"]`` and their results are recorded in the
+    per‑game arrays `final_score`, `final_max_tile` and `final_length`
+    (last finished episode of each slot), alongside the running `score`
+    and `length` of the current ones.
+    """
+
+    ACTIONS = Game2048Env.ACTIONS
+
+    def __init__(self, n: int, seed: int | None = None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.boards = BatchBoard(n=n, rng=self.rng)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_max_tile = np.zeros(n, dtype=np.uint8)  # log2
+        self.final_length = np.zeros(n, dtype=np.int64)
+        self.episodes = 0  # finished games over all slots
+
+    def seed(self, seed: int | None = None) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.boards.rng = self.rng
+
+    def _spawn(self, sel: np.ndarray, times: int = 1) -> None:
+        sub = BatchBoard(self.boards.raw[sel], rng=self.rng)
+        for _ in range(times):
+            sub.popup()
+        self.boards.raw[sel] = sub.raw
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        if seed is not None:
+            self.seed(seed)
+        self.boards.raw[:] = 0
+        self._spawn(np.arange(self.n), times=2)
+        self.score[:] = 0
+        self.length[:] = 0
+        return self.boards.raw.copy()
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        rewards = self.boards.move(actions)
+        illegal = rewards == -1
+        rewards[illegal] = 0
+        self._spawn(np.flatnonzero(~illegal))  # only add a tile on valid moves
+        self.score += rewards
+        self.length += 1
+        done = ~self.boards.can_move()
+        final = self.boards.raw.copy()
+        ended = np.flatnonzero(done)
+        if ended.size:
+            self.final_score[ended] = self.score[ended]
+            self.final_max_tile[ended] = BatchBoard.tiles_of(final[ended]).max(axis=1)
+            self.final_length[ended] = self.length[ended]
+            self.episodes += ended.size
+            self.score[ended] = 0
+            self.length[ended] = 0
+            self.boards.raw[ended] = 0
+            self._spawn(ended, times=2)
+        info = {"illegal": illegal, "final_state": final}
+        return self.boards.raw.copy(), rewards, done, info
+
+    def sample_moves(self) -> np.ndarray:
+        return self.rng.integers(0, 4, self.n)
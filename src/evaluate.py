@@ -0,0 +1,115 @@
+"""Greedy evaluation of a checkpoint over many seeded games.
+
+Run from ``src/``::
+
+    python evaluate.py weights.bin --games 100000 --workers 8 --json eval.json
+
+Every game is played with ε = 0 and no updates, its tile spawns seeded by
+its own seed, so a game's outcome depends on nothing but the weights and
+that seed.  Workers load the checkpoint once, memory‑mapped read‑only
+(binary checkpoints), so a process pool shares a single page‑cache copy of
+the tables.  Per‑game results are aggregated in seed order: everything but
+the timings is identical for a given seed list whatever the worker count.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from env import Game2048Env
+from learners import Learner, FeatureTD0Learner
+
+__all__ = ["play", "evaluate"]
+
+REACH = (11, 12, 13, 14, 15)  # log2 of 2048 … 32768
+
+
+def play(learner: Learner, seed: int) -> tuple[float, int, int]:
+    """One greedy game: ``(score, max tile as log2, moves)``."""
+    env = Game2048Env(seed=seed)
+    state, done, total, moves = env.reset(), False, 0.0, 0
+    while not done:
+        state, reward, done, _ = env.step(learner.select_action(state, 0.0))
+        total += reward
+        moves += 1
+    return total, max((state >> (4 * i)) & 0x0F for i in range(16)), moves
+
+
+# ──────────────────────────── workers ────────────────────────────────
+
+_learner: Optional[FeatureTD0Learner] = None  # per worker process
+
+
+def _load(path: str) -> FeatureTD0Learner:
+    ln = FeatureTD0Learner()
+    ln.load(path, mmap_mode="r")  # legacy pickles are read into memory
+    return ln
+
+
+def _init(path: str) -> None:
+    global _learner
+    _learner = _load(path)
+
+
+def _play(seed: int) -> tuple[float, int, int]:
+    return play(_learner, seed)
+
+
+# ──────────────────────────── evaluation ─────────────────────────────
+
+def evaluate(path: str, seeds: Iterable[int], workers: int = 1, chunksize: int = 16) -> dict:
+    """Play one greedy game per seed with the weights at *path*.
+
+    *workers* > 1 spreads the games over a process pool.  Returns games,
+    avg / max score, ``reach_2048`` … ``reach_32768`` (share of games whose
+    largest tile got there), total moves, seconds and moves / sec.
+    """
+    seeds = list(seeds)
+    t0 = time.perf_counter()
+    if workers > 1:
+        with mp.get_context().Pool(workers, initializer=_init, initargs=(path,)) as pool:
+            results = pool.map(_play, seeds, chunksize)  # in seed order
+    else:
+        ln = _load(path)
+        results = [play(ln, s) for s in seeds]
+    seconds = time.perf_counter() - t0
+
+    scores = np.array([r[0] for r in results], dtype=np.float64)
+    tiles = np.array([r[1] for r in results], dtype=np.int64)
+    moves = sum(r[2] for r in results)
+    report = {
+        "games": len(seeds),
+        "avg_score": float(scores.mean()) if len(seeds) else 0.0,
+        "max_score": float(scores.max()) if len(seeds) else 0.0,
+    }
+    for t in REACH:
+        report[f"reach_{1 << t}"] = float((tiles >= t).mean()) if len(seeds) else 0.0
+    report.update(moves=moves, seconds=seconds, moves_per_sec=moves / seconds if seconds else 0.0)
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("weights", help="FeatureTD0Learner checkpoint")
+    ap.add_argument("--games", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0, help="first seed; games use seed..seed+games-1")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count())
+    ap.add_argument("--chunksize", type=int, default=16, help="games per task sent to a worker")
+    ap.add_argument("--json", help="also write the report here")
+    args = ap.parse_args()
+
+    r = evaluate(args.weights, range(args.seed, args.seed + args.games), args.workers, args.chunksize)
+    print(f"games    {r['games']} on {args.workers} workers ({r['seconds']:.1f} s, "
+          f"{r['moves_per_sec']:,.0f} moves/s)")
+    print(f"score    avg {r['avg_score']:.1f}  max {r['max_score']:.0f}")
+    print("reach    " + "  ".join(f"{1 << t}: {r[f'reach_{1 << t}']:.1%}" for t in REACH))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(r, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
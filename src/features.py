@@ -1,8 +1,12 @@
 import abc
 import struct
 import typing
+from array import array
 from sys import stderr
-from board import board
+
+import numpy as np
+
+from board import board, transpose_raw
 
 # ──────────────────────────── helpers ────────────────────────────────
 
@@ -16,10 +20,20 @@ def error(msg: str):
 # ──────────────────────────── base table ─────────────────────────────
 
 class feature(abc.ABC):
-    """Base class for n‑tuple feature tables (weight look‑ups)."""
+    """Base class for n‑tuple feature tables (weight look‑ups).
+
+    Weights live in one contiguous NumPy array (``float32`` by default,
+    ``float64`` on request).  Passing *weight* adopts an existing array
+    (e.g. a memory‑mapped checkpoint) instead of allocating one.
+    """
 
-    def __init__(self, length: int):
-        self.weight = feature.alloc(length)
+    def __init__(self, length: int, dtype: typing.Any = np.float32, weight: np.ndarray | None = None):
+        if weight is None:
+            weight = feature.alloc(length, dtype)
+        elif len(weight) != length:
+            error(f"weight table has {len(weight)} entries ({length} expected)")
+            exit(1)
+        self.weight = weight
 
     # --- list‑like helpers -------------------------------------------------
     def __getitem__(self, i: int) -> float:
@@ -34,22 +48,39 @@ class feature(abc.ABC):
     def size(self) -> int:
         return len(self.weight)
 
+    def nbytes(self) -> int:
+        """Actual memory held by the weight table."""
+        return self.weight.nbytes
+
     # --- abstract interface ----------------------------------------------
+    # `b` may be a `board` or its raw 64‑bit int; the training loop passes
+    # raw ints so it never has to build board objects.
     @abc.abstractmethod
-    def estimate(self, b: board) -> float:  # value‑function estimate
+    def estimate(self, b: board | int) -> float:  # value‑function estimate
         ...
 
     @abc.abstractmethod
-    def update(self, b: board, u: float) -> float:  # gradient / TD‑step
+    def update(self, b: board | int, u: float) -> float:  # gradient / TD‑step
         ...
 
     @abc.abstractmethod
     def name(self) -> str:  # printable id
         ...
 
+    # --- batched interface (generic fallback: one scalar call per board) ---
+    def estimate_batch(self, raws: np.ndarray) -> np.ndarray:
+        """Estimates for a ``uint64`` array of boards, as ``float32``."""
+        return np.array([self.estimate(int(r)) for r in raws], dtype=np.float32)
+
+    def update_batch(self, raws: np.ndarray, deltas: np.ndarray) -> np.ndarray:
+        """Apply ``update(raws[k], deltas[k])`` for every *k*."""
+        return np.array(
+            [self.update(int(r), float(u)) for r, u in zip(raws, deltas)], dtype=np.float32
+        )
+
     # --- (de)serialisation -------------------------------------------------
-    def dump(self, b: board, out: typing.Callable = info) -> None:
-        out(f"{b}\nestimate = {self.estimate(b)}")
+    def dump(self, b: board | int, out: typing.Callable = info) -> None:
+        out(f"{board(int(b))}\nestimate = {self.estimate(b)}")
 
     def write(self, output: typing.BinaryIO) -> None:
         name = self.name().encode("utf-8")
@@ -57,7 +88,7 @@ class feature(abc.ABC):
         output.write(name)
         size = len(self.weight)
         output.write(struct.pack("Q", size))
-        output.write(struct.pack(f"{size}f", *self.weight))
+        output.write(self.weight.astype("<f4", copy=False).tobytes())
 
     def read(self, input: typing.BinaryIO) -> None:
         size = struct.unpack("I", input.read(4))[0]
@@ -69,23 +100,91 @@ class feature(abc.ABC):
         if size != len(self.weight):
             error(f"unexpected feature size {size} for {self.name()} ({self.size()} expected)")
             exit(1)
-        self.weight = list(struct.unpack(f"{size}f", input.read(size * 4)))
-        if len(self.weight) != size:
+        # fill the existing table in place: it may be a view that a
+        # TupleNetwork or a memory map shares
+        if self.weight.dtype == np.dtype("<f4") and self.weight.flags.c_contiguous:
+            n = input.readinto(memoryview(self.weight).cast("B"))
+        else:
+            data = input.read(size * 4)
+            n = len(data)
+            if n == size * 4:
+                self.weight[:] = np.frombuffer(data, dtype="<f4")
+        if n != size * 4:
             error("unexpected end of binary")
             exit(1)
 
     # --- memory guard ------------------------------------------------------
     @staticmethod
-    def alloc(num: int) -> list[float]:
-        """Allocate a weight table while enforcing a 1‑GiB global cap."""
+    def alloc(num: int, dtype: typing.Any = np.float32) -> np.ndarray:
+        """Allocate a zeroed weight table while enforcing a 1‑GiB global cap
+        on the bytes actually allocated."""
         if not hasattr(feature.alloc, "total"):
             feature.alloc.total = 0
-            feature.alloc.limit = (1 << 30) // 4  # 1 GiB worth of floats
-        feature.alloc.total += num
+            feature.alloc.limit = 1 << 30  # bytes
+        nbytes = num * np.dtype(dtype).itemsize
+        feature.alloc.total += nbytes
         if feature.alloc.total > feature.alloc.limit:
             error("memory limit exceeded" + str(feature.alloc.total))
             exit(1)
-        return [0.0] * num
+        return np.zeros(num, dtype=dtype)
+
+    @staticmethod
+    def free(table: np.ndarray) -> None:
+        """Return a table allocated by `alloc` to the global budget."""
+        if hasattr(feature.alloc, "total"):
+            feature.alloc.total -= table.nbytes
+
+    @staticmethod
+    def owned(table: typing.Any) -> bool:
+        """Whether *table* (or what it views) is in‑process memory, i.e.
+        charged to `alloc`; memory maps and shared‑memory views are not."""
+        while isinstance(table, np.ndarray) and isinstance(table.base, np.ndarray):
+            table = table.base
+        return isinstance(table, np.ndarray) and table.base is None
+
+    def release(self) -> None:
+        """Return this feature's tables to the `alloc` budget when dropping
+        it; tables it does not own are left alone."""
+        if feature.owned(self.weight):
+            feature.free(self.weight)
+
+
+# ──────────────────────────── index plans ─────────────────────────────
+# A pattern index is assembled from the board's 16‑bit lines (rows, or rows
+# of the transposed board = columns): for each line the tuple touches, a
+# 65536‑entry table maps the line value straight to its partial index.
+# Tables depend only on which cells of the line feed which tuple slots (and
+# on the radix), so they are shared between isomorphisms and patterns.
+#
+# With radix r < 16 the index is mixed‑radix, Σ min(tile_k, r−1)·r^k: tiles
+# above the cap are clamped into the top digit.  Partial indices of
+# different lines still never overlap, so they are combined by addition.
+
+_line_tables: dict[tuple[tuple[tuple[int, int], ...], int], array] = {}
+
+
+def _line_table(cells: tuple[tuple[int, int], ...], radix: int = 16) -> array:
+    """Table for a line whose cell *c* feeds tuple slot *k*, for (c, k) in *cells*."""
+    table = _line_tables.get((cells, radix))
+    if table is None:
+        line = np.arange(65536, dtype=np.uint64)
+        part = np.zeros(65536, dtype=np.uint64)
+        for c, k in cells:
+            tile = np.minimum((line >> np.uint64(c << 2)) & np.uint64(0x0F), np.uint64(radix - 1))
+            part += tile * np.uint64(radix**k)
+        # array indexing yields plain ints, much faster than NumPy scalars
+        table = array("Q", part.tobytes())
+        _line_tables[(cells, radix)] = table
+    return table
+
+
+def lines_of(raw: int, cols: bool = True) -> tuple[int, ...]:
+    """Rows 0‑3 of *raw*, then (if *cols*) columns 0‑3, as 16‑bit lines."""
+    rows = (raw & 0xFFFF, (raw >> 16) & 0xFFFF, (raw >> 32) & 0xFFFF, (raw >> 48) & 0xFFFF)
+    if not cols:
+        return rows
+    t = transpose_raw(raw)
+    return rows + (t & 0xFFFF, (t >> 16) & 0xFFFF, (t >> 32) & 0xFFFF, (t >> 48) & 0xFFFF)
 
 
 # ──────────────────────────── n‑tuple feature ─────────────────────────
@@ -99,17 +198,43 @@ class pattern(feature):
               * 1 = none
               * 4 = rotations
               * 8 = rotations + mirror (default)
+        dtype: weight precision, ``np.float32`` (default) or ``np.float64``.
+        weight: existing table to adopt instead of allocating a new one.
+        radix: values per cell (2–16).  Below 16 the table shrinks to
+               radix^|patt| entries (a 6‑tuple at base 12: 2.99M instead
+               of 16.8M) and tiles ≥ 2^(radix−1) share the top value.
+
+    `enable_tc` adds temporal‑coherence accumulators (see `update_tc`);
+    `track_dirty` flags written table chunks for incremental checkpoints.
     """
 
-    def __init__(self, patt: list[int], iso: int = 8):
+    # temporal‑coherence accumulators, None unless `enable_tc` was called
+    tc_e: np.ndarray | None = None
+    tc_a: np.ndarray | None = None
+    # one byte per 2**dirty_shift table entries, None unless `track_dirty`
+    dirty: bytearray | None = None
+    dirty_shift: int = 14
+
+    def __init__(
+        self,
+        patt: list[int],
+        iso: int = 8,
+        dtype: typing.Any = np.float32,
+        weight: np.ndarray | None = None,
+        radix: int = 16,
+    ):
         if not patt:
             error("pattern cannot be empty")
             exit(1)
         if iso not in (1, 4, 8):
             error("iso must be 1, 4, or 8")
             exit(1)
+        if not 2 <= radix <= 16:
+            error("radix must be between 2 and 16")
+            exit(1)
 
-        super().__init__(1 << (len(patt) * 4))  # dense table size: 16^|patt|
+        self.radix = radix
+        super().__init__(radix ** len(patt), dtype, weight)  # dense table size: radix^|patt|
 
         # Build all unique isomorphic variants of the index pattern.
         self.isom: list[list[int]] = []
@@ -129,42 +254,381 @@ class pattern(feature):
                 b = mir.clone(); b.rotate(r)
                 self.isom.append([b.at(t) for t in patt])
 
+        self._compile()
+
+    # ----------------------------------------------------------------------
+    #  index plan
+    # ----------------------------------------------------------------------
+    def _compile(self) -> None:
+        """Build `plan`: per isomorphism, the ``(line, table)`` terms whose
+        lookups are added to give its index: each table maps a line to its
+        cells' mixed‑radix digits, already scaled, so the sum is the index.
+        *line* indexes `lines_of` (0‑3 rows, 4‑7 columns); each isomorphism
+        uses whichever axis needs fewer lines."""
+        self.plan: list[tuple[tuple[int, array], ...]] = []
+        for iso in self.isom:
+            rows: dict[int, list[tuple[int, int]]] = {}
+            cols: dict[int, list[tuple[int, int]]] = {}
+            for k, pos in enumerate(iso):
+                rows.setdefault(pos >> 2, []).append((pos & 3, k))
+                cols.setdefault(pos & 3, []).append((pos >> 2, k))
+            if len(cols) < len(rows):
+                terms = tuple((4 + c, _line_table(tuple(v), self.radix)) for c, v in sorted(cols.items()))
+            else:
+                terms = tuple((r, _line_table(tuple(v), self.radix)) for r, v in sorted(rows.items()))
+            self.plan.append(terms)
+        self.uses_cols = any(j >= 4 for terms in self.plan for j, _ in terms)
+        # batched path: nibble shift of every (isomorphism, slot) cell
+        self._shifts = np.array(self.isom, dtype=np.uint64) << np.uint64(2)
+        self._digits = np.uint64(self.radix) ** np.arange(len(self.isom[0]), dtype=np.uint64)
+
+    def indices(self, b: board | int) -> list[int]:
+        """Table index of every isomorphism of *b*."""
+        lines = lines_of(int(b), self.uses_cols)
+        out = []
+        for terms in self.plan:
+            idx = 0
+            for j, table in terms:
+                idx += table[lines[j]]
+            out.append(idx)
+        return out
+
+    def indices_batch(self, raws: np.ndarray) -> np.ndarray:
+        """``(N, iso)`` table indices for a ``uint64`` array of boards."""
+        raws = np.asarray(raws, dtype=np.uint64).reshape(-1)
+        nib = (raws[:, None, None] >> self._shifts) & np.uint64(0x0F)
+        if self.radix < 16:
+            nib = np.minimum(nib, np.uint64(self.radix - 1))
+        return (nib * self._digits).sum(axis=2, dtype=np.uint64).astype(np.intp)
+
+    # plan tables are shared caches: rebuild instead of pickling them
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("plan", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state.setdefault("radix", 16)  # pickles from before reduced radix
+        for key in ("weight", "tc_e", "tc_a"):
+            table = state.get(key)
+            if isinstance(table, (list, np.ndarray)):  # charged like any table we own
+                state[key] = feature.alloc(len(table), getattr(table, "dtype", np.float32))
+                state[key][:] = table
+        self.__dict__.update(state)
+        self._compile()
+
     # ----------------------------------------------------------------------
     #  value lookup / TD updates
     # ----------------------------------------------------------------------
-    def estimate(self, b: board) -> float:
-        return sum(self.weight[self._index_of(iso, b)] for iso in self.isom)
+    def estimate(self, b: board | int) -> float:
+        get = self.weight.item  # Python floats: faster than NumPy scalars here
+        val = 0.0
+        for idx in self.indices(b):
+            val += get(idx)
+        return val
 
-    def update(self, b: board, u: float) -> float:
+    def update(self, b: board | int, u: float) -> float:
         adjust = u / len(self.isom)
+        weight = self.weight
         val = 0.0
-        for iso in self.isom:
-            idx = self._index_of(iso, b)
-            self.weight[idx] += adjust
-            val += self.weight[idx]
+        idxs = self.indices(b)
+        for idx in idxs:
+            weight[idx] += adjust
+            val += weight.item(idx)
+        if self.dirty is not None:
+            self.mark_dirty(idxs)
         return val
 
+    # ----------------------------------------------------------------------
+    #  dirty chunks (incremental checkpoints, see `autosave`)
+    # ----------------------------------------------------------------------
+    def track_dirty(self, shift: int = 14) -> None:
+        """Start flagging written chunks of ``2**shift`` entries in `dirty`.
+
+        Every update sets the byte of each chunk it touches (the table, and
+        the TC accumulators, which share its indices); whoever checkpoints
+        clears them.  16 Ki‑entry chunks cost 1 KiB per 6‑tuple table.
+        """
+        if not isinstance(self.weight, np.ndarray):
+            error(f"{self.name()}: dirty tracking needs a dense table")
+            exit(1)
+        if self.dirty is None or self.dirty_shift != shift:
+            self.dirty_shift = shift
+            self.dirty = bytearray(((self.size() - 1) >> shift) + 1)
+
+    def mark_dirty(self, idxs: typing.Iterable[int]) -> None:
+        dirty, shift = self.dirty, self.dirty_shift
+        for idx in idxs:
+            dirty[idx >> shift] = 1
+
+    # ----------------------------------------------------------------------
+    #  temporal coherence (Beal & Smith; Jaśkowski 2018)
+    # ----------------------------------------------------------------------
+    def enable_tc(self) -> None:
+        """Allocate the per‑entry TC accumulators E (Σ error) and A (Σ |error|).
+
+        Two ``float32`` arrays the size of the table: 8 B per entry, i.e.
+        128 MiB next to a 64 MiB ``float32`` 6‑tuple (3× its memory).
+        """
+        if not isinstance(self.weight, np.ndarray):
+            error(f"{self.name()}: temporal coherence needs a dense table")
+            exit(1)
+        if self.tc_e is None:
+            self.tc_e = feature.alloc(self.size(), np.float32)
+            self.tc_a = feature.alloc(self.size(), np.float32)
+
+    def update_tc(self, b: board | int, u: float, err: float) -> float:
+        """TC step: entry *i* moves by ``u · |E_i| / A_i`` (its share per
+        isomorphism; rate 1 while ``A_i = 0``), then ``E_i += err`` and
+        ``A_i += |err|``.  Returns the updated estimate."""
+        adjust = u / len(self.isom)
+        weight, E, A = self.weight, self.tc_e, self.tc_a
+        abs_err = abs(err)
+        idxs = self.indices(b)
+        for idx in idxs:
+            a = A.item(idx)
+            weight[idx] += adjust * (abs(E.item(idx)) / a if a else 1.0)
+            E[idx] += err
+            A[idx] += abs_err
+        if self.dirty is not None:
+            self.mark_dirty(idxs)
+        return sum(weight.item(idx) for idx in idxs)
+
+    def nbytes(self) -> int:
+        n = super().nbytes()
+        return n if self.tc_e is None else n + self.tc_e.nbytes + self.tc_a.nbytes
+
+    def release(self) -> None:
+        super().release()
+        for table in (self.tc_e, self.tc_a):
+            if feature.owned(table):
+                feature.free(table)
+
+    def estimate_batch(self, raws: np.ndarray) -> np.ndarray:
+        idx = self.indices_batch(raws)
+        return self.weight[idx].sum(axis=1, dtype=np.float64).astype(np.float32)
+
+    def update_batch(self, raws: np.ndarray, deltas: np.ndarray) -> np.ndarray:
+        """Batched `update`: board *k* moves by ``deltas[k]``.
+
+        Indices shared between boards or isomorphisms accumulate (unbuffered
+        ``np.add.at``), exactly as repeated scalar updates would.  Returns
+        the updated estimates.
+        """
+        idx = self.indices_batch(raws)
+        adjust = np.asarray(deltas, dtype=self.weight.dtype).reshape(-1, 1) / len(self.isom)
+        np.add.at(self.weight, idx, np.broadcast_to(adjust, idx.shape))
+        if self.dirty is not None:
+            np.frombuffer(self.dirty, dtype=np.uint8)[idx >> self.dirty_shift] = 1
+        return self.weight[idx].sum(axis=1, dtype=np.float64).astype(np.float32)
+
     # ----------------------------------------------------------------------
     #  misc helpers
     # ----------------------------------------------------------------------
     def name(self) -> str:
-        return f"{len(self.isom[0])}-tuple pattern {self._name_of(self.isom[0])}"
-
-    # low‑level index helpers ----------------------------------------------
-    @staticmethod
-    def _index_of(patt: list[int], b: board) -> int:
-        idx = 0
-        for i, pos in enumerate(patt):
-            idx |= b.at(pos) << (4 * i)
-        return idx
+        name = f"{len(self.isom[0])}-tuple pattern {self._name_of(self.isom[0])}"
+        return name if self.radix == 16 else f"{name} base {self.radix}"
 
+    # low‑level helpers ----------------------------------------------------
     @staticmethod
     def _name_of(patt: list[int]) -> str:
         return "".join(f"{p:x}" for p in patt)
 
     # pretty printer -------------------------------------------------------
-    def dump(self, b: board, out: typing.Callable = info) -> None:
-        for iso in self.isom:
-            idx = self._index_of(iso, b)
-            tiles = [(idx >> (4 * i)) & 0x0F for i in range(len(iso))]
-            out(f"#{self._name_of(iso)}[{self._name_of(tiles)}] = {self.weight[idx]}")
\ No newline at end of file
+    def dump(self, b: board | int, out: typing.Callable = info) -> None:
+        for iso, idx in zip(self.isom, self.indices(b)):
+            tiles = [idx // self.radix**i % self.radix for i in range(len(iso))]
+            out(f"#{self._name_of(iso)}[{self._name_of(tiles)}] = {self.weight[idx]}")
+
+# ──────────────────────────── quantized pattern ───────────────────────
+
+class quantized_pattern(pattern):
+    """Inference‑only `pattern` with a ``float16`` or scaled ``int16`` table.
+
+    The stored value times `scale` is the weight.  Use `from_pattern` to
+    quantize a trained table: ``int16`` maps ±max|w| onto ±32767, ``float16``
+    keeps ``scale = 1`` unless the weights exceed its range.  Halves the
+    memory of a ``float32`` table; `update` is not supported.
+    """
+
+    def __init__(
+        self,
+        patt: list[int],
+        iso: int = 8,
+        dtype: typing.Any = np.int16,
+        weight: np.ndarray | None = None,
+        radix: int = 16,
+        scale: float = 1.0,
+    ):
+        if np.dtype(dtype) not in (np.dtype(np.float16), np.dtype(np.int16)):
+            error("quantized tables must be float16 or int16")
+            exit(1)
+        super().__init__(patt, iso, dtype, weight, radix)
+        self.scale = float(scale)
+
+    @classmethod
+    def from_pattern(cls, p: pattern, dtype: typing.Any = np.int16) -> "quantized_pattern":
+        """Quantized copy of the trained pattern *p* (same tuple, iso, radix)."""
+        dtype = np.dtype(dtype)
+        peak = float(np.abs(p.weight).max()) if p.size() else 0.0
+        if dtype == np.int16:
+            scale = peak / 32767 if peak else 1.0
+        else:  # power of two, so float16 rounding is all that changes
+            scale = 2.0 ** max(0, int(np.ceil(np.log2(peak / 32768)))) if peak else 1.0
+        q = cls(list(p.isom[0]), len(p.isom), dtype, radix=p.radix, scale=scale)
+        w = np.asarray(p.weight, dtype=np.float64) / scale
+        q.weight[:] = np.rint(w) if dtype == np.int16 else w
+        return q
+
+    def estimate(self, b: board | int) -> float:
+        return super().estimate(b) * self.scale
+
+    def estimate_batch(self, raws: np.ndarray) -> np.ndarray:
+        idx = self.indices_batch(raws)
+        return (self.weight[idx].sum(axis=1, dtype=np.float64) * self.scale).astype(np.float32)
+
+    def update(self, b: board | int, u: float) -> float:
+        error(f"{self.name()}: quantized tables are inference only")
+        exit(1)
+
+    def update_batch(self, raws: np.ndarray, deltas: np.ndarray) -> np.ndarray:
+        return self.update(0, 0.0)
+
+    # the TDL2048 layout stores float32 only
+    def write(self, output: typing.BinaryIO) -> None:
+        error(f"{self.name()}: quantized tables cannot be written in the TDL2048 layout")
+        exit(1)
+
+    def read(self, input: typing.BinaryIO) -> None:
+        error(f"{self.name()}: quantized tables cannot be read from the TDL2048 layout")
+        exit(1)
+
+    def dump(self, b: board | int, out: typing.Callable = info) -> None:
+        for iso, idx in zip(self.isom, self.indices(b)):
+            tiles = [idx // self.radix**i % self.radix for i in range(len(iso))]
+            out(f"#{self._name_of(iso)}[{self._name_of(tiles)}] = {self.weight.item(idx) * self.scale}")
+
+
+# ──────────────────────────── tuple network ───────────────────────────
+
+class TupleNetwork:
+    """Fused evaluator over a set of `pattern` features.
+
+    All weight tables are moved into one concatenated array (each pattern's
+    `weight` becomes a view into it) and every pattern's index plan is
+    merged into a single plan with table offsets.  The 16‑bit lines of a
+    board are fetched once per call and the full index vector (features ×
+    isomorphisms) is computed once, then gathered from / scattered into the
+    shared storage.  Results match summing the individual patterns.
+
+    *weight* adopts storage the patterns already view in order (e.g. a
+    memory‑mapped checkpoint), so nothing is copied.
+    """
+
+    def __init__(self, features: list[pattern], weight: np.ndarray | None = None):
+        self.features = list(features)
+        total = sum(f.size() for f in self.features)
+        self.plan: list[tuple[int, tuple[tuple[int, array], ...]]] = []
+        self.scale: list[float] = []  # per‑entry share of a unit update
+        if weight is not None:
+            if len(weight) != total:
+                raise ValueError(f"weight has {len(weight)} entries ({total} expected)")
+            self.weight = weight
+            self._build(copy=False)
+            return
+        dtype = np.result_type(*(f.weight.dtype for f in self.features))
+        for f in self.features:  # the fused copy takes over their charge
+            if feature.owned(f.weight):
+                feature.free(f.weight)
+        self.weight = feature.alloc(total, dtype)
+        self._build(copy=True)
+
+    def _build(self, copy: bool) -> None:
+        offset = 0
+        for f in self.features:
+            view = self.weight[offset : offset + f.size()]
+            if copy:
+                view[:] = f.weight
+            f.weight = view
+            for terms in f.plan:
+                self.plan.append((offset, terms))
+                self.scale.append(1.0 / (len(self.features) * len(f.isom)))
+            offset += f.size()
+        self.uses_cols = any(f.uses_cols for f in self.features)
+        self.track_dirty()
+
+    def track_dirty(self) -> None:
+        """Mark fused updates in the patterns' `dirty` maps; call again after
+        enabling `pattern.track_dirty` on features already fused."""
+        self._marks: list[tuple[bytearray, int, int]] | None = None
+        if all(getattr(f, "dirty", None) is not None for f in self.features):
+            self._marks, offset = [], 0
+            for f in self.features:
+                self._marks += [(f.dirty, offset, f.dirty_shift)] * len(f.plan)
+                offset += f.size()
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def indices(self, b: board | int) -> list[int]:
+        """Offsets into `weight` of every feature × isomorphism of *b*."""
+        lines = lines_of(int(b), self.uses_cols)
+        out = []
+        for idx, terms in self.plan:
+            for j, table in terms:
+                idx += table[lines[j]]  # partial indices never overlap
+            out.append(idx)
+        return out
+
+    def estimate(self, b: board | int) -> float:
+        return self.gather(self.indices(b))
+
+    def gather(self, idxs: list[int]) -> float:
+        """Value from precomputed `indices` (current weights, no re‑indexing)."""
+        get = self.weight.item
+        val = 0.0
+        for idx in idxs:
+            val += get(idx)
+        return val
+
+    def estimate_many(self, boards: typing.Iterable[board | int]) -> np.ndarray:
+        """Values of several boards with one gather over the weights."""
+        idx = np.array([self.indices(b) for b in boards], dtype=np.intp)
+        if not idx.size:
+            return np.zeros(len(idx))
+        return self.weight[idx].sum(axis=1, dtype=np.float64)
+
+    def estimate_batch(self, raws: np.ndarray) -> np.ndarray:
+        """Vectorized V() of a ``uint64`` array of boards, as ``float32``."""
+        out = np.zeros(len(raws), dtype=np.float64)
+        for f in self.features:
+            out += f.estimate_batch(raws)
+        return out.astype(np.float32)
+
+    def update_batch(self, raws: np.ndarray, deltas: np.ndarray) -> None:
+        """Move V(raws[k]) by ``deltas[k]``, split evenly over the features."""
+        deltas = np.asarray(deltas) / len(self.features)
+        for f in self.features:
+            f.update_batch(raws, deltas)
+
+    def estimate_and_update(
+        self, b: board | int, target: float, alpha: float, idxs: list[int] | None = None
+    ) -> float:
+        """TD step towards *target*: returns V(b) before the update, then
+        moves V(b) by ``alpha · (target − V(b))``, split evenly over the
+        features and their isomorphisms like `FeatureTD0Learner` does.
+        *idxs* are b's `indices` if the caller already has them."""
+        if idxs is None:
+            idxs = self.indices(b)
+        weight = self.weight
+        get = weight.item
+        val = 0.0
+        for idx in idxs:
+            val += get(idx)
+        step = alpha * (target - val)
+        for idx, s in zip(idxs, self.scale):
+            weight[idx] += step * s
+        if self._marks is not None:
+            for idx, (dirty, offset, shift) in zip(idxs, self._marks):
+                dirty[(idx - offset) >> shift] = 1
+        return val
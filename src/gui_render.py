@@ -1,3 +1,12 @@
+"""Tk board view for watching training.
+
+`BoardView` draws synchronously on the calling thread; `AsyncBoardView`
+runs it on its own thread so the training loop only hands over frames.
+Both redraw only the tiles whose value changed.
+"""
+import queue
+import threading
+import time
 import tkinter as tk
 
 # tile colours (log2 value → bg, fg)
@@ -44,12 +53,68 @@ class BoardView:
             )
             for r in range(size) for c in range(size)
         ]
+        self.shown = None  # last drawn raw board
 
-    def draw(self, raw_value: int):
+    def draw(self, raw_value: int, update: bool = True):
+        old = self.shown
         for idx in range(16):
             v = (raw_value >> (4*idx)) & 0xF
+            if old is not None and v == (old >> (4*idx)) & 0xF:
+                continue  # tile unchanged
             bg, fg = COLORS.get(v, COLORS[11])
             self.canvas.itemconfig(self.tiles[idx], fill=bg)
             self.canvas.itemconfig(self.labels[idx], text="" if v == 0 else str(1 << v), fill=fg)
-        self.window.update_idletasks()
-        self.window.update()
\ No newline at end of file
+        self.shown = raw_value
+        if update:
+            self.window.update_idletasks()
+            self.window.update()
+
+
+class AsyncBoardView:
+    """`BoardView` on a renderer thread, fed through a latest‑frame‑wins slot.
+
+    `draw` never blocks: it replaces any frame the renderer has not picked
+    up yet.  The renderer shows at most *fps* frames per second and keeps
+    the window responsive in between.  All Tk calls happen on the renderer
+    thread (fine on Linux/Windows; macOS Tk insists on the main thread).
+    """
+
+    def __init__(self, size=4, tile_px=100, fps=30):
+        self.period = 1.0 / fps
+        self.frames = queue.Queue(maxsize=1)
+        self.closed = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, args=(size, tile_px), name="BoardView", daemon=True
+        )
+        self.thread.start()
+
+    def draw(self, raw_value: int):
+        if self.closed.is_set():
+            return
+        try:
+            self.frames.put_nowait(raw_value)
+        except queue.Full:  # drop the stale frame (single producer)
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put_nowait(raw_value)
+
+    def close(self):
+        self.closed.set()
+        self.thread.join()
+
+    def _run(self, size, tile_px):
+        view = BoardView(size, tile_px)
+        try:
+            while not self.closed.is_set():
+                t0 = time.monotonic()
+                try:
+                    view.draw(self.frames.get(timeout=self.period), update=False)
+                except queue.Empty:
+                    pass
+                view.window.update()
+                time.sleep(max(0.0, self.period - (time.monotonic() - t0)))
+            view.window.destroy()
+        except tk.TclError:  # window closed by the user
+            self.closed.set()
\ No newline at end of file
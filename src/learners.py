@@ -1,16 +1,23 @@
 import abc
 import random
+import os
 import pickle
 from typing import Any, Optional, List
 
 import numpy as np
-from board import board
-from features import feature, info, error
+import checkpoint
+from telemetry import Metrics
+from batch import BatchBoard
+from board import board, afterstates
+from features import feature, pattern, quantized_pattern, TupleNetwork, info, error
 
 
 __all__ = [
     "Learner",
     "FeatureTD0Learner",
+    "FeatureTDLambdaLearner",
+    "FeatureTCLearner",
+    "InferenceLearner",
 ]
 
 # ───────────────────────────── base interface ──────────────────────────────
@@ -54,27 +61,37 @@ class FeatureTD0Learner(Learner):
 
     For each legal move we evaluate Q(s,a) = r(a) + γ·V(afterstate).
     Learning updates the *afterstate* value function V approximated by the
-    sum of all registered feature tables.
+    sum of all registered feature tables.  When every feature is a
+    `pattern`, V is evaluated through a fused `TupleNetwork`.
+
+    The afterstates of the last evaluated state (with their network
+    indices) are cached: `update` bootstraps from the afterstates of
+    *s_next*, and the following ``select_action(s_next)`` and
+    ``update(s_next, a, ...)`` reuse them, re‑reading only the (possibly
+    just updated) weights.
     """
 
     def __init__(self, alpha: float = 0.1, gamma: float = 0.99):
         self.alpha = float(alpha)
         self.gamma = float(gamma)
         self.features: List[feature] = []
-        # --- statistics (optional) ---
-        self._scores: List[float] = []
-        self._maxtile: List[int] = []
+        self._net: Optional[TupleNetwork] = None
+        self._cache: tuple[int, list] | None = None  # (state, _expand(state))
+        # --- statistics: constant‑memory telemetry, also fed by RLAgent ---
+        self.metrics = Metrics()
 
     # ──────────────────────── feature management ──────────────────────────
 
     def add_feature(self, feat: feature) -> None:
         """Register a pre‑constructed feature table.
 
-        *No* sparse override here — the Pattern class indexes `weight` as a list;
-        replacing it with a dict would break indexing semantics.
+        Dense `pattern`s and hashed `sparse.sparse_pattern`s (for 7/8‑tuples)
+        may be mixed; the fused `TupleNetwork` path needs all dense.
         """
         self.features.append(feat)
-        usage_bytes = feat.size() * 4  # float32
+        self._net = None
+        self._cache = None
+        usage_bytes = feat.nbytes()
         if   usage_bytes >= 1 << 30:
             usage = f"{usage_bytes >> 30} GB"
         elif usage_bytes >= 1 << 20:
@@ -85,6 +102,44 @@ class FeatureTD0Learner(Learner):
             usage = f"{usage_bytes} B"
         info(f"Registered feature: {feat.name()} (size = {feat.size()}, {usage})")
 
+    def network(self) -> Optional[TupleNetwork]:
+        """Fused evaluator over `features`, or None unless all are patterns."""
+        if self._net is None and self._fusable():
+            self._net = TupleNetwork(self.features)
+        return self._net
+
+    def _fusable(self) -> bool:
+        return bool(self.features) and all(
+            isinstance(f, pattern)
+            and not isinstance(f, quantized_pattern)
+            and isinstance(f.weight, np.ndarray)
+            for f in self.features
+        )
+
+    def value(self, after: int) -> float:
+        """V(after) summed over all features."""
+        net = self.network()
+        if net is not None:
+            return net.estimate(after)
+        return sum(f.estimate(after) for f in self.features)
+
+    def _expand(self, s: int) -> list[tuple[int, int, int, Optional[list[int]]]]:
+        """Legal ``(action, afterstate, reward, indices)`` of *s*, cached per
+        state; *indices* are `TupleNetwork.indices` (None without a network)."""
+        if self._cache is not None and self._cache[0] == s:
+            return self._cache[1]
+        net = self.network()
+        moves = [
+            (a, after, r, None if net is None else net.indices(after))
+            for a, (after, r, legal) in enumerate(afterstates(s))
+            if legal
+        ]
+        self._cache = (s, moves)
+        return moves
+
+    def _value_of(self, after: int, idxs: Optional[list[int]]) -> float:
+        return self.value(after) if idxs is None else self._net.gather(idxs)
+
     # ─────────────────────── policy (ϵ‑greedy) ────────────────────────────
 
     def select_action(self, s: int, eps: float) -> int:
@@ -93,17 +148,37 @@ class FeatureTD0Learner(Learner):
             return random.randrange(4)
 
         best_a, best_q = 0, -float("inf")
-        for a in range(4):
-            after = board(s)
-            r = after.move(a)
-            if r == -1:
-                continue  # illegal
-            v = sum(f.estimate(after) for f in self.features)
-            q = r + self.gamma * v
+        moves = self._expand(s)
+        for a, after, r, idxs in moves:
+            q = r + self.gamma * self._value_of(after, idxs)
             if q > best_q:
                 best_a, best_q = a, q
+        self.metrics.estimates += len(moves)
         return best_a
 
+    def select_actions(
+        self, states: np.ndarray, eps: float = 0.0, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """ϵ‑greedy actions for a ``uint64`` array of states (e.g. from
+        `VectorGame2048Env`), scoring all 4·n afterstates in one batch.
+        Exploration draws from *rng* (e.g. the env's ``rng``), or from
+        NumPy's global RNG without one."""
+        after, reward, legal = BatchBoard.afterstates_of(states)
+        net = self.network()
+        flat = after.reshape(-1)
+        if net is not None:
+            values = net.estimate_batch(flat)
+        else:
+            values = sum(f.estimate_batch(flat) for f in self.features)
+        q = reward + self.gamma * np.asarray(values, dtype=np.float64).reshape(after.shape)
+        q[~legal] = -np.inf
+        actions = q.argmax(axis=1)
+        if eps > 0:
+            draw, pick = (np.random.random, np.random.randint) if rng is None else (rng.random, rng.integers)
+            explore = draw(len(actions)) < eps
+            actions[explore] = pick(0, 4, int(explore.sum()))
+        return actions
+
     # ───────────────────────── TD(0) update ───────────────────────────────
 
     def update(
@@ -120,28 +195,36 @@ class FeatureTD0Learner(Learner):
         if not self.features:
             return  # nothing to train yet
 
-        # --- current afterstate value --------------------------------------
-        after0 = board(s)
-        r0 = after0.move(a)
-        if r0 == -1:
+        # --- current afterstate (cached by select_action) --------------------
+        for a0, after0, r0, idx0 in self._expand(s):
+            if a0 == a:
+                break
+        else:
             return  # illegal move slipped through
-        v0 = sum(f.estimate(after0) for f in self.features)
 
         # --- bootstrap target ---------------------------------------------
         if done:
             target = r0  # no future value
         else:
             best_q = -float("inf")
-            for a2 in range(4):
-                after1 = board(s_next)
-                r1 = after1.move(a2)
-                if r1 == -1:
-                    continue
-                v1 = sum(f.estimate(after1) for f in self.features)
-                best_q = max(best_q, r1 + self.gamma * v1)
+            moves = self._expand(s_next)
+            for _, after1, r1, idxs in moves:
+                best_q = max(best_q, r1 + self.gamma * self._value_of(after1, idxs))
             target = r0 + self.gamma * (0.0 if best_q == -float("inf") else best_q)
-
-        # --- weight update --------------------------------------------------
+            self.metrics.estimates += len(moves)
+
+        self._apply(after0, idx0, target)
+        self.metrics.estimates += 1
+        self.metrics.updates += 1
+
+    def _apply(self, after0: int, idx0: Optional[list[int]], target: float) -> None:
+        """Move V(after0) towards *target* (*idx0*: its cached indices)."""
+        net = self.network()
+        if net is not None:
+            # after0's indices come from the cache: no re‑indexing
+            net.estimate_and_update(after0, target, self.alpha, idx0)
+            return
+        v0 = sum(f.estimate(after0) for f in self.features)
         delta = target - v0
         step = self.alpha * delta / len(self.features)
         for f in self.features:
@@ -150,36 +233,251 @@ class FeatureTD0Learner(Learner):
     # ────────────────────────── utils / I/O ───────────────────────────────
 
     def save(self, path: str):
-        with open(path, "wb") as f:
-            pickle.dump(self.features, f)
+        """Write the weights in the binary checkpoint format (`checkpoint`)."""
+        checkpoint.save_features(path, self.features, self._meta())
         info(f"[FeatureTD0] saved feature list → {path}")
 
-    def load(self, path: str):
-        try:
+    def load(self, path: str, mmap_mode: Optional[str] = None):
+        """Load weights from a binary checkpoint or a legacy pickle.
+
+        *mmap_mode* (binary checkpoints only) maps the file instead of
+        reading it: ``"r"`` shares one read‑only copy between processes,
+        ``"r+"`` trains directly against the file.  The tables of the
+        features replaced are returned to the `feature.alloc` budget.
+        """
+        if not os.path.exists(path):
+            error(f"Cannot load learner weights: {path} (file not found)")
+            return
+        for f in self.features:  # before the new tables are charged
+            f.release()
+        self._net = None
+        self._cache = None
+        if checkpoint.is_checkpoint(path):
+            self.features, weight, _ = checkpoint.load_features(path, mmap_mode)
+            if weight is not None and self._fusable():
+                self._net = TupleNetwork(self.features, weight)
+        else:
             with open(path, "rb") as f:
                 self.features = pickle.load(f)
-            info(f"[FeatureTD0] loaded feature list ← {path}")
-        except FileNotFoundError:
-            error(f"Cannot load learner weights: {path} (file not found)")
+        info(f"[FeatureTD0] loaded feature list ← {path}")
+
+    def _meta(self) -> dict:
+        return {"learner": type(self).__name__, "alpha": self.alpha, "gamma": self.gamma}
+
+    def track_dirty(self, shift: int = 14) -> None:
+        """Flag written weight chunks on every feature (`pattern.track_dirty`),
+        through the fused network too; used by `autosave.CheckpointManager`."""
+        for f in self.features:
+            f.track_dirty(shift)
+        if self._net is not None:
+            self._net.track_dirty()
 
     # ────────────────────────── simple stats (optional) ───────────────────
 
     def record_episode(self, b: board, score: float):
-        self._scores.append(score)
-        self._maxtile.append(max(b.at(i) for i in range(16)))
+        self.metrics.record_episode(score, max(b.at(i) for i in range(16)))
 
     def flush_stats(self, n: int, unit: int = 1000):
-        if n % unit != 0 or not self._scores:
+        games, avg_score, max_score, counts = self.metrics.unit_report()
+        if n % unit != 0 or not games:
             return
-        avg_score = sum(self._scores) / len(self._scores)
-        max_score = max(self._scores)
         info(f"{n}\tavg = {avg_score:.1f}\tmax = {max_score}")
         # tile distribution
-        counts = [self._maxtile.count(t) for t in range(16)]
-        coef = 100 / len(self._scores)
+        coef = 100 / games
         for t in range(1, 16):
             if counts[t]:
-                win = sum(counts[t:]) * coef
+                win = counts[t:].sum() * coef
                 share = counts[t] * coef
                 info(f"\t{1<<t}\t{win:.1f}%\t({share:.1f}%)")
-        self._scores.clear(); self._maxtile.clear()
+        snap = self.metrics.snapshot("report")
+        info(f"\t{snap['moves_per_sec']:.0f} moves/s\t{snap['estimates_per_sec']:.0f} estimates/s"
+             f"\t{snap['updates_per_sec']:.0f} updates/s")
+        self.metrics.reset_unit()
+
+
+# ─────────────────── backward‑replay TD(λ) / n‑step learner ────────────────
+
+class FeatureTDLambdaLearner(FeatureTD0Learner):
+    """Episode‑replay learner: TD(λ) or n‑step updates in one backward pass.
+
+    `update` only records each move's afterstate and reward in
+    preallocated ``uint64`` / ``float32`` buffers; when the episode ends the
+    afterstates are replayed from last to first (as in TDL2048's backward
+    training) with all network indices extracted in one batched call.
+
+    V(after) here is the return *following* the afterstate, so the last
+    one is pulled towards 0 and, going backwards,
+
+        λ‑return:  G_t = r_{t+1} + γ·((1−λ)·V(after_{t+1}) + λ·G_{t+1})
+        n‑step:    G_t = Σ_{k=1..n} γ^{k−1}·r_{t+k} + γ^n·V(after_{t+n})
+
+    where V(after_{t+k}) is the value just updated by the replay.
+    ``lam=0`` or ``n_step=1`` is plain backward TD(0).
+    Call `reset_traces` at the start of every episode.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        gamma: float = 0.99,
+        lam: float = 0.5,
+        n_step: Optional[int] = None,
+        capacity: int = 1 << 12,
+    ):
+        super().__init__(alpha, gamma)
+        if n_step is not None and n_step < 1:
+            error("n_step must be at least 1")
+            exit(1)
+        self.lam = float(lam)
+        self.n_step = n_step
+        self._afters = np.empty(capacity, dtype=np.uint64)
+        self._rewards = np.empty(capacity, dtype=np.float32)
+        self._len = 0
+
+    def reset_traces(self) -> None:
+        """Drop any partially recorded episode."""
+        self._len = 0
+
+    def update(
+        self,
+        s: int,
+        a: Optional[int],
+        r: float,
+        s_next: int,
+        a_next: Optional[int],
+        done: bool,
+    ) -> None:
+        if a is not None and 0 <= a <= 3 and self.features:
+            for a0, after0, r0, _ in self._expand(s):
+                if a0 == a:
+                    self._record(after0, r0)
+                    break
+        if done:
+            self._replay()
+            self._len = 0
+
+    def _record(self, after: int, reward: float) -> None:
+        if self._len == len(self._afters):  # long game: double the buffers
+            self._afters = np.concatenate([self._afters, np.empty_like(self._afters)])
+            self._rewards = np.concatenate([self._rewards, np.empty_like(self._rewards)])
+        self._afters[self._len] = after
+        self._rewards[self._len] = reward
+        self._len += 1
+
+    # ─────────────────────────── replay ───────────────────────────────────
+
+    def _indices(self, afters: np.ndarray) -> Optional[list[list[int]]]:
+        """Fused‑network indices of every afterstate, from batched extraction."""
+        net = self.network()
+        if net is None:
+            return None
+        parts, offset = [], 0
+        for f in net.features:
+            parts.append(f.indices_batch(afters) + offset)
+            offset += f.size()
+        return np.concatenate(parts, axis=1).tolist()
+
+    def _step(self, after: int, idxs: Optional[list[int]], target: float) -> float:
+        """Move V(after) towards *target*; returns the updated value."""
+        if idxs is not None:
+            self._net.estimate_and_update(after, target, self.alpha, idxs)
+            return self._net.gather(idxs)
+        v = sum(f.estimate(after) for f in self.features)
+        step = self.alpha * (target - v) / len(self.features)
+        for f in self.features:
+            f.update(after, step)
+        # re‑estimate: `update`'s return value misses repeated isomorphism indices
+        return sum(f.estimate(after) for f in self.features)
+
+    def _replay(self) -> None:
+        T = self._len
+        if not T:
+            return
+        afters = self._afters[:T]
+        rewards = self._rewards[:T].astype(np.float64).tolist()
+        idx = self._indices(afters)
+        after_list = afters.tolist()
+        gamma = self.gamma
+        if self.n_step is None:
+            lam, ret = self.lam, 0.0  # λ‑return of after_t, 0 for the last
+            for t in range(T - 1, -1, -1):
+                v = self._step(after_list[t], None if idx is None else idx[t], ret)
+                ret = rewards[t] + gamma * ((1.0 - lam) * v + lam * ret)
+            return
+        # n‑step: discounted reward sums from suffix sums R_t = Σ_k γ^{k−1} r_{t+k}
+        n = self.n_step
+        suffix = [0.0] * (T + 1)
+        for t in range(T - 1, 0, -1):
+            suffix[t - 1] = rewards[t] + gamma * suffix[t]
+        values = [0.0] * (T + n)  # updated V of after_t; 0 past the end
+        for t in range(T - 1, -1, -1):
+            end = min(t + n, T)
+            target = suffix[t] - gamma ** (end - t) * suffix[end] + gamma**n * values[t + n]
+            values[t] = self._step(after_list[t], None if idx is None else idx[t], target)
+
+    def _meta(self) -> dict:
+        return {**super()._meta(), "lam": self.lam, "n_step": self.n_step}
+
+
+# ─────────────────── temporal‑coherence TD(0) learner ──────────────────────
+
+class FeatureTCLearner(FeatureTD0Learner):
+    """TD(0) with temporal‑coherence (TC) adaptive step sizes.
+
+    Every table entry *i* keeps E_i = Σ δ and A_i = Σ |δ| over the TD errors
+    δ it has seen and learns at rate ``alpha · |E_i| / A_i``: entries whose
+    errors keep the same sign stay fast, oscillating ones slow down, so
+    *alpha* (a meta rate, 1.0 by default) needs no schedule.
+
+    TC is switched on per pattern (``add_feature(feat, tc=False)`` keeps a
+    fixed *alpha*).  The accumulators are two ``float32`` arrays per table,
+    8 B per entry on top of the 4 B weight (a 4×6‑tuple network grows from
+    256 MiB to 768 MiB), and are saved in checkpoints.
+    """
+
+    def __init__(self, alpha: float = 1.0, gamma: float = 0.99):
+        super().__init__(alpha, gamma)
+
+    def add_feature(self, feat: feature, tc: bool = True) -> None:
+        if tc:
+            if not isinstance(feat, pattern):
+                error(f"{feat.name()}: temporal coherence needs a pattern")
+                exit(1)
+            feat.enable_tc()
+        super().add_feature(feat)
+
+    def _apply(self, after0: int, idx0: Optional[list[int]], target: float) -> None:
+        if not any(getattr(f, "tc_e", None) is not None for f in self.features):
+            return super()._apply(after0, idx0, target)
+        v0 = self.value(after0) if idx0 is None else self._net.gather(idx0)
+        delta = target - v0
+        step = self.alpha * delta / len(self.features)
+        for f in self.features:
+            if getattr(f, "tc_e", None) is not None:
+                f.update_tc(after0, step, delta)
+            else:
+                f.update(after0, step)
+
+
+# ─────────────────────── quantized inference learner ───────────────────────
+
+class InferenceLearner(FeatureTD0Learner):
+    """Play‑only counterpart of `FeatureTD0Learner` over `quantized_pattern`s.
+
+    Selects actions exactly like the trained learner but from ``float16`` /
+    ``int16`` tables (half the memory of ``float32``); `update` is a no‑op.
+    """
+
+    @classmethod
+    def from_learner(cls, learner: FeatureTD0Learner, dtype: Any = np.int16) -> "InferenceLearner":
+        """Quantize every pattern of a trained *learner* to *dtype*."""
+        ln = cls(learner.alpha, learner.gamma)
+        for f in learner.features:
+            if not isinstance(f, pattern) or not isinstance(f.weight, np.ndarray):
+                error(f"cannot quantize {f.name()}")
+                exit(1)
+            ln.add_feature(quantized_pattern.from_pattern(f, dtype))
+        return ln
+
+    def update(self, *_, **__) -> None:
+        pass
@@ -0,0 +1,244 @@
+"""Multi‑process (Hogwild) self‑play training on shared‑memory weight tables.
+
+All `pattern` tables live back to back in one `multiprocessing.shared_memory`
+block, laid out exactly like a `TupleNetwork`'s storage.  K worker
+processes attach to it by name, each plays its own `Game2048Env` and applies
+TD(0) updates straight into the shared tables without locks (Hogwild:
+colliding writes are rare and lose at most one small step).  The
+coordinator owns ε and its decay, aggregates per‑episode results (and the
+workers' move / estimate / update counts and phase times) through the
+usual `FeatureTD0Learner` statistics and writes checkpoints.
+
+    trainer = ParallelTrainer(TUPLES, workers=8, alpha=0.01)
+    trainer.train(100_000, checkpoint_path="weights.bin", checkpoint_every=10_000)
+    learner = trainer.learner()     # private copy of the trained weights
+    trainer.close()
+
+Shared tables are not charged to `feature.alloc`'s budget.
+"""
+import multiprocessing as mp
+import queue
+import random
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+import checkpoint
+from agent import RLAgent
+from board import board
+from env import Game2048Env
+from features import pattern, TupleNetwork, info
+from learners import FeatureTD0Learner
+
+__all__ = ["SharedTables", "ParallelTrainer"]
+
+
+# ──────────────────────────── shared tables ──────────────────────────
+
+class SharedTables:
+    """`pattern` tables over one shared‑memory block.
+
+    Args:
+        spec:   ``(tuple, iso, radix)`` per pattern.
+        name:   attach to an existing block instead of creating one.
+    """
+
+    def __init__(self, spec: list[tuple[list[int], int, int]], name: str | None = None):
+        self.spec = spec
+        sizes = [radix ** len(t) for t, _, radix in spec]
+        nbytes = sum(sizes) * np.dtype(np.float32).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.weight = np.ndarray(sum(sizes), dtype=np.float32, buffer=self.shm.buf)
+        if self.owner:
+            self.weight.fill(0.0)
+        self.features, first = [], 0
+        for (t, iso, radix), size in zip(spec, sizes):
+            view = self.weight[first : first + size]
+            self.features.append(pattern(t, iso=iso, weight=view, radix=radix))
+            first += size
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def learner(self, alpha: float, gamma: float) -> FeatureTD0Learner:
+        """TD(0) learner training in place on the shared tables."""
+        ln = FeatureTD0Learner(alpha, gamma)
+        ln.features = list(self.features)
+        ln._net = TupleNetwork(ln.features, self.weight)
+        return ln
+
+    def close(self) -> None:
+        """Detach; the creating side also frees the block."""
+        self.features, self.weight = [], None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ──────────────────────────── worker ─────────────────────────────────
+
+def _worker(
+    wid: int,
+    name: str,
+    spec: list,
+    alpha: float,
+    gamma: float,
+    seed: int,
+    eps: Any,
+    issued: Any,
+    episodes: int,
+    results: Any,
+) -> None:
+    tables = SharedTables(spec, name)
+    random.seed(seed * 7919 + wid)  # ε draws
+    env = Game2048Env(seed=seed * 7919 + wid)
+    agent = RLAgent(env, tables.learner(alpha, gamma), decay=1.0)
+    metrics = agent.ln.metrics
+    while True:
+        with issued.get_lock():  # claim the next episode
+            if issued.value >= episodes:
+                break
+            issued.value += 1
+        agent.eps = eps.value
+        t0 = time.perf_counter()
+        score = agent.run_episode()
+        # this episode's counters and phase times, for the coordinator's Metrics
+        counts = (metrics.moves, metrics.estimates, metrics.updates, dict(metrics.seconds))
+        metrics.moves = metrics.estimates = metrics.updates = 0
+        metrics.seconds = dict.fromkeys(metrics.PHASES, 0.0)
+        results.put((wid, score, env.b.raw, time.perf_counter() - t0, counts))
+    results.put((wid, None, 0, 0.0, None))
+    tables.close()
+
+
+# ──────────────────────────── coordinator ────────────────────────────
+
+class ParallelTrainer:
+    """Hogwild TD(0) self‑play over *tuples* with *workers* processes.
+
+    ε starts at *epsilon* and decays by *decay* per finished episode (shared
+    by all workers) down to *eps_min*, matching `RLAgent`'s per‑episode
+    schedule.  Seeds are ``seed``‑derived per worker.
+    """
+
+    def __init__(
+        self,
+        tuples: list[list[int]],
+        workers: int = 4,
+        alpha: float = 0.1,
+        gamma: float = 0.99,
+        epsilon: float = 0.1,
+        decay: float = 0.9995,
+        eps_min: float = 0.01,
+        iso: int = 8,
+        radix: int = 16,
+        seed: int = 0,
+    ):
+        self.spec = [(list(t), iso, radix) for t in tuples]
+        self.workers = workers
+        self.alpha, self.gamma = float(alpha), float(gamma)
+        self.eps, self.decay, self.eps_min = epsilon, decay, eps_min
+        self.seed = seed
+        self.episodes = 0
+        self.tables = SharedTables(self.spec)
+        self.stats = self.tables.learner(self.alpha, self.gamma)  # stats + checkpoints
+
+    def train(
+        self,
+        episodes: int,
+        callback: Optional[Callable[[int, float, int], None]] = None,
+        unit: int = 1000,
+        checkpoint_path: str | None = None,
+        checkpoint_every: int | None = None,
+    ) -> float:
+        """Play *episodes* games across the workers; returns episodes/sec.
+
+        *callback* gets ``(episode_idx, score, final_raw)`` for every finished
+        game.  With *checkpoint_path*, the tables are saved every
+        *checkpoint_every* episodes (while workers keep training) and at the
+        end.
+        """
+        ctx = mp.get_context()
+        eps = ctx.Value("d", self.eps, lock=False)
+        issued = ctx.Value("q", 0)
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=_worker,
+                args=(w, self.tables.name, self.spec, self.alpha, self.gamma,
+                      self.seed + self.episodes, eps, issued, episodes, results),
+                daemon=True,
+            )
+            for w in range(self.workers)
+        ]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        running = len(procs)
+        finished = set()
+        while running:
+            try:
+                wid, score, raw, _, counts = results.get(timeout=1.0)
+            except queue.Empty:
+                # a worker that died (exception, kill) never sends its sentinel
+                dead = [w for w, p in enumerate(procs) if p.exitcode not in (None, 0) and w not in finished]
+                if dead:
+                    for p in procs:
+                        p.terminate()
+                    for p in procs:
+                        p.join()
+                    codes = ", ".join(f"#{w}: exit code {procs[w].exitcode}" for w in dead)
+                    raise RuntimeError(f"parallel worker died ({codes})")
+                continue
+            if score is None:
+                finished.add(wid)
+                running -= 1
+                continue
+            self.episodes += 1
+            self.eps = max(self.eps_min, self.eps * self.decay)
+            eps.value = self.eps
+            m = self.stats.metrics
+            moves, estimates, updates, seconds = counts
+            m.moves += moves
+            m.estimates += estimates
+            m.updates += updates
+            for phase, t in seconds.items():
+                m.add_time(phase, t)
+            self.stats.record_episode(board(raw), score)
+            self.stats.flush_stats(self.episodes, unit)
+            if callback is not None:
+                callback(self.episodes, score, raw)
+            if checkpoint_path and checkpoint_every and self.episodes % checkpoint_every == 0:
+                self.save(checkpoint_path)
+        for p in procs:
+            p.join()
+        rate = episodes / (time.perf_counter() - t0)
+        info(f"[parallel] {episodes} episodes on {self.workers} workers: {rate:.1f} episodes/s")
+        if checkpoint_path:
+            self.save(checkpoint_path)
+        return rate
+
+    def save(self, path: str) -> None:
+        """Checkpoint the shared tables (a Hogwild snapshot: workers may be
+        mid‑update) together with ε and the episode count."""
+        meta = {**self.stats._meta(), "epsilon": self.eps, "episodes": self.episodes}
+        checkpoint.save_features(path, self.tables.features, meta)
+
+    def learner(self) -> FeatureTD0Learner:
+        """`FeatureTD0Learner` over a private copy of the current weights."""
+        ln = FeatureTD0Learner(self.alpha, self.gamma)
+        for f in self.tables.features:
+            ln.add_feature(pattern(list(f.isom[0]), iso=len(f.isom), weight=f.weight.copy(), radix=f.radix))
+        return ln
+
+    def close(self) -> None:
+        self.stats = None
+        self.tables.close()
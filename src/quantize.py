@@ -0,0 +1,64 @@
+"""Quantize trained weights for play and measure what it costs in score.
+
+Run from ``src/``::
+
+    python quantize.py weights.bin --dtype int16 --games 200 --out weights-q.bin
+
+Loads a `FeatureTD0Learner` checkpoint, builds its `InferenceLearner`
+(``float16`` or scaled ``int16`` tables), plays the same seeded greedy games
+with both and prints the average‑score delta and the memory saved.
+"""
+import argparse
+from typing import Iterable
+
+import numpy as np
+
+from evaluate import play
+from learners import Learner, FeatureTD0Learner, InferenceLearner
+
+__all__ = ["play_greedy", "score_delta"]
+
+
+def play_greedy(learner: Learner, seed: int) -> float:
+    """Score of one ε = 0 game without updates, spawns seeded by *seed*."""
+    return play(learner, seed)[0]
+
+
+def score_delta(reference: Learner, quantized: Learner, seeds: Iterable[int]) -> dict:
+    """Average scores of both learners over *seeds* and their difference."""
+    seeds = list(seeds)
+    ref = np.array([play_greedy(reference, s) for s in seeds])
+    qnt = np.array([play_greedy(quantized, s) for s in seeds])
+    return {
+        "games": len(seeds),
+        "reference": float(ref.mean()),
+        "quantized": float(qnt.mean()),
+        "delta": float(qnt.mean() - ref.mean()),
+        "same_score": float((ref == qnt).mean()),  # share of identical games
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("weights", help="FeatureTD0Learner checkpoint")
+    ap.add_argument("--dtype", choices=("int16", "float16"), default="int16")
+    ap.add_argument("--games", type=int, default=100, help="seeds 0..games-1")
+    ap.add_argument("--out", help="write the quantized checkpoint here")
+    args = ap.parse_args()
+
+    ln = FeatureTD0Learner()
+    ln.load(args.weights)
+    q = InferenceLearner.from_learner(ln, args.dtype)
+    if args.out:
+        q.save(args.out)
+
+    before = sum(f.nbytes() for f in ln.features)
+    after = sum(f.nbytes() for f in q.features)
+    print(f"tables   {before / 2**20:.1f} MiB → {after / 2**20:.1f} MiB ({args.dtype})")
+    r = score_delta(ln, q, range(args.games))
+    print(f"avg      {r['reference']:.1f} → {r['quantized']:.1f} "
+          f"(Δ {r['delta']:+.1f} over {r['games']} games, {r['same_score']:.0%} identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Depth‑limited expectimax over the value network.
+
+Max nodes choose a move, chance nodes average over every spawn (a 2 with
+probability 0.9 or a 4 with 0.1 on each empty cell), and afterstates at
+the depth limit are scored by the learner's V.  ``depth=1`` reproduces the
+learner's greedy `select_action`.
+
+Chance‑node values are cached in a transposition table keyed by the raw
+afterstate or, with ``canonical=True``, by the smallest of its 8 symmetric
+variants (sound when every pattern uses ``iso=8``, so V is symmetric).
+The table is bounded by keeping two generations of at most ``tt_size / 2``
+entries: when the current one fills up, the older one is dropped.
+Branches whose probability falls below *min_prob* are cut off at V, and
+with a *time_budget* the search deepens iteratively, keeping the move of
+the deepest completed iteration.
+"""
+import random
+import time
+from typing import Any, Optional
+
+from board import afterstates, transpose_raw
+
+__all__ = ["ExpectimaxAgent", "canonical"]
+
+_SPAWNS = ((1, 0.9), (2, 0.1))  # (log2 tile, probability)
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _mirror(raw: int) -> int:
+    return (
+        ((raw & 0x000F000F000F000F) << 12)
+        | ((raw & 0x00F000F000F000F0) << 4)
+        | ((raw & 0x0F000F000F000F00) >> 4)
+        | ((raw & 0xF000F000F000F000) >> 12)
+    )
+
+
+def _flip(raw: int) -> int:
+    return (
+        ((raw & 0x000000000000FFFF) << 48)
+        | ((raw & 0x00000000FFFF0000) << 16)
+        | ((raw & 0x0000FFFF00000000) >> 16)
+        | ((raw & 0xFFFF000000000000) >> 48)
+    )
+
+
+def canonical(raw: int) -> int:
+    """Smallest of the 8 rotations / reflections of *raw*."""
+    f = _flip(raw)
+    t = transpose_raw(raw)
+    tf = _flip(t)
+    return min(raw, _mirror(raw), f, _mirror(f), t, _mirror(t), tf, _mirror(tf))
+
+
+class ExpectimaxAgent:
+    """Expectimax player on top of a trained learner's afterstate values.
+
+    Args:
+        learner:     provides ``value(after)`` and ``gamma`` (e.g. a
+                     `FeatureTD0Learner` or `InferenceLearner`).
+        depth:       max nodes per line of play (1 = greedy).
+        time_budget: seconds per move; deepens 1, 2, … up to *depth* and
+                     keeps the deepest finished result.  None searches
+                     straight at *depth*.
+        tt_size:     transposition‑table capacity in entries.
+        canonical:   key the table by symmetry‑canonical boards.
+        min_prob:    chance branches less likely than this are scored by V.
+
+    Drop‑in for `select_action` users (`RLAgent`, evaluation loops);
+    `update` does nothing.
+    """
+
+    CHECK_EVERY = 64  # nodes between clock reads under a time budget
+
+    def __init__(
+        self,
+        learner: Any,
+        depth: int = 2,
+        time_budget: Optional[float] = None,
+        tt_size: int = 1 << 20,
+        canonical: bool = False,
+        min_prob: float = 1e-4,
+    ):
+        self.learner = learner
+        self.depth = depth
+        self.time_budget = time_budget
+        self.tt_size = tt_size
+        self.canonical = canonical
+        self.min_prob = min_prob
+        self._tt: dict[int, tuple[int, float]] = {}
+        self._tt_old: dict[int, tuple[int, float]] = {}
+        self._deadline: Optional[float] = None
+        self._next_check = float("inf")  # node count of the next clock read
+        self.reset_stats()
+
+    # ─────────────────────────── statistics ───────────────────────────────
+
+    def reset_stats(self) -> None:
+        self.nodes = 0       # max + chance + leaf nodes visited
+        self.lookups = 0     # transposition‑table probes
+        self.hits = 0
+        self.evicted = 0
+        self.moves = 0
+        self.depth_sum = 0   # deepest completed iteration, summed per move
+        self.seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "moves": self.moves,
+            "nodes": self.nodes,
+            "nodes_per_sec": self.nodes / self.seconds if self.seconds else 0.0,
+            "tt_entries": len(self._tt) + len(self._tt_old),
+            "tt_hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "tt_evicted": self.evicted,
+            "avg_depth": self.depth_sum / self.moves if self.moves else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Empty the transposition table (e.g. after the weights change)."""
+        self._tt, self._tt_old = {}, {}
+
+    # ─────────────────────────── agent API ────────────────────────────────
+
+    def select_action(self, s: int, eps: float = 0.0) -> int:
+        if eps and random.random() < eps:
+            return random.randrange(4)
+        t0 = time.perf_counter()
+        if self.time_budget is None:
+            best, done = self._root(s, self.depth), self.depth
+        else:
+            best, done = self._root(s, 1), 1  # always finish the greedy ply
+            self._deadline = t0 + self.time_budget
+            self._next_check = self.nodes
+            try:
+                for d in range(2, self.depth + 1):
+                    best, done = self._root(s, d), d
+            except _Timeout:
+                pass
+            self._deadline, self._next_check = None, float("inf")
+        self.seconds += time.perf_counter() - t0
+        self.moves += 1
+        self.depth_sum += done
+        return best
+
+    def update(self, *_, **__) -> None:
+        pass
+
+    # ─────────────────────────── search ───────────────────────────────────
+
+    def _root(self, s: int, depth: int) -> int:
+        gamma = self.learner.gamma
+        best_a, best_q = 0, -float("inf")
+        for a, (after, r, legal) in enumerate(afterstates(s)):
+            if not legal:
+                continue
+            q = r + gamma * self._chance(after, depth - 1, 1.0)
+            if q > best_q:
+                best_a, best_q = a, q
+        return best_a
+
+    def _check_clock(self) -> None:
+        """Raise `_Timeout` past the deadline; next read in `CHECK_EVERY` nodes."""
+        self._next_check = self.nodes + self.CHECK_EVERY
+        if time.perf_counter() > self._deadline:
+            raise _Timeout
+
+    def _max(self, s: int, depth: int, prob: float) -> float:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_clock()
+        gamma = self.learner.gamma
+        best = None
+        for after, r, legal in afterstates(s):
+            if legal:
+                q = r + gamma * self._chance(after, depth - 1, prob)
+                if best is None or q > best:
+                    best = q
+        return 0.0 if best is None else best  # game over: no further reward
+
+    def _chance(self, after: int, depth: int, prob: float) -> float:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_clock()
+        if depth <= 0 or prob < self.min_prob:
+            return self.learner.value(after)
+
+        key = canonical(after) if self.canonical else after
+        self.lookups += 1
+        hit = self._tt.get(key) or self._tt_old.get(key)
+        if hit is not None and hit[0] >= depth:
+            self.hits += 1
+            return hit[1]
+
+        x = after | (after >> 1)
+        x |= x >> 2
+        empty = ~x & 0x1111111111111111  # bit 4i set iff cell i is empty
+        n = empty.bit_count()
+        total = 0.0
+        while empty:
+            low = empty & -empty
+            empty ^= low
+            for tile, p in _SPAWNS:
+                total += p * self._max(after | (low * tile), depth, prob * p / n)
+        value = total / n
+
+        if len(self._tt) >= self.tt_size >> 1:
+            self.evicted += len(self._tt_old)
+            self._tt_old, self._tt = self._tt, {}
+        self._tt[key] = (depth, value)
+        return value
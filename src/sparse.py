@@ -0,0 +1,316 @@
+"""Hashed (sparse) weight storage for large n‑tuple patterns.
+
+A 7‑tuple needs 16^7 = 268M dense weights and an 8‑tuple 4.3G, far beyond
+the `feature.alloc` cap, yet training only ever visits a small fraction of
+them.  `HashTable` stores just the visited entries in open‑addressing
+NumPy arrays (linear probing, Fibonacci hashing); `sparse_pattern` is a
+`pattern` backed by one.
+
+Per entry the table costs 8 B key + value + 4 B visit count + 8 B update
+stamp (24 B at float32), sized to a power of two and kept below
+`max_load` occupancy.  Without a memory budget it grows by doubling; with
+one it stays at the largest capacity that fits and, when full, evicts
+the least recently updated (``"lru"``) or least visited (``"min_visit"``)
+quarter of its entries.
+"""
+import typing
+
+import numpy as np
+
+from board import board
+from features import feature, pattern, error
+
+__all__ = ["HashTable", "sparse_pattern"]
+
+_EMPTY = np.uint64(0xFFFFFFFFFFFFFFFF)
+_GOLDEN = 0x9E3779B97F4A7C15  # 2^64 / φ
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class HashTable:
+    """Open‑addressing map from table index to weight over NumPy arrays.
+
+    Args:
+        length:   logical size of the index space (``len()`` of the table).
+        capacity: initial number of slots (rounded up to a power of two).
+        dtype:    value precision.
+        budget:   optional cap in bytes; fixes the capacity and enables
+                  eviction instead of growth.
+        eviction: ``"lru"`` or ``"min_visit"`` (used only with a budget).
+        max_load: occupancy that triggers growth / eviction.
+    """
+
+    def __init__(
+        self,
+        length: int,
+        capacity: int = 1 << 16,
+        dtype: typing.Any = np.float32,
+        budget: int | None = None,
+        eviction: str = "lru",
+        max_load: float = 0.75,
+    ):
+        if eviction not in ("lru", "min_visit"):
+            error(f"unknown eviction policy {eviction!r}")
+            exit(1)
+        self.length = length
+        self.dtype = np.dtype(dtype)
+        self.budget = budget
+        self.eviction = eviction
+        self.max_load = max_load
+        self.evicted = 0
+        self.clock = 0
+        if budget is not None:
+            capacity = 1 << max(4, (budget // self.entry_bytes()).bit_length() - 1)
+        self._alloc(1 << max(4, (capacity - 1).bit_length()))
+
+    def entry_bytes(self) -> int:
+        """Bytes per slot: key, value, visit count and update stamp."""
+        return 8 + self.dtype.itemsize + 4 + 8
+
+    def _alloc(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.shift = 64 - (capacity.bit_length() - 1)
+        self.mask = capacity - 1
+        self.count = 0
+        self.keys = feature.alloc(capacity, np.uint64)
+        self.keys.fill(_EMPTY)
+        self.values = feature.alloc(capacity, self.dtype)
+        self.visits = feature.alloc(capacity, np.uint32)
+        self.stamps = feature.alloc(capacity, np.uint64)
+
+    def _release(self) -> None:
+        for a in (self.keys, self.values, self.visits, self.stamps):
+            feature.free(a)
+
+    # ──────────────────────── reporting ───────────────────────────────
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.values.nbytes + self.visits.nbytes + self.stamps.nbytes
+
+    def occupancy(self) -> float:
+        return self.count / self.capacity
+
+    def stats(self) -> dict:
+        return {
+            "entries": self.count,
+            "capacity": self.capacity,
+            "occupancy": self.occupancy(),
+            "nbytes": self.nbytes,
+            "evicted": self.evicted,
+        }
+
+    # ──────────────────────── scalar access ───────────────────────────
+
+    def _find(self, key: int) -> int:
+        """Slot holding *key*, or ``-(slot + 1)`` of the empty slot ending
+        its probe sequence."""
+        keys, mask = self.keys, self.mask
+        s = ((key * _GOLDEN) & _MASK64) >> self.shift
+        while True:
+            k = keys.item(s)
+            if k == key:
+                return s
+            if k == 0xFFFFFFFFFFFFFFFF:
+                return -s - 1
+            s = (s + 1) & mask
+
+    def get(self, key: int) -> float:
+        """Weight at *key* (0.0 if never updated)."""
+        s = self._find(key)
+        return self.values.item(s) if s >= 0 else 0.0
+
+    __getitem__ = get
+
+    def add(self, key: int, delta: float) -> float:
+        """Add *delta* at *key* (inserting it if needed); returns the new weight."""
+        s = self._find(key)
+        if s < 0:
+            if self.count + 1 > self.max_load * self.capacity:
+                self._make_room(1)
+                s = self._find(key)
+            s = -s - 1
+            self.keys[s] = key
+            self.count += 1
+        self.values[s] += delta
+        self.visits[s] += 1
+        self.clock += 1
+        self.stamps[s] = self.clock
+        return self.values.item(s)
+
+    def __setitem__(self, key: int, v: float) -> None:
+        self.add(key, v - self.get(key))
+
+    # ──────────────────────── batched access ──────────────────────────
+
+    def _probe(self, keys: np.ndarray, insert: bool) -> np.ndarray:
+        """Slots of unique *keys* (-1 if absent and not inserting)."""
+        slots = ((keys * np.uint64(_GOLDEN)) >> np.uint64(self.shift)).astype(np.intp)
+        out = np.full(len(keys), -1, dtype=np.intp)
+        pending = np.arange(len(keys))
+        while pending.size:
+            s = slots[pending]
+            k = self.keys[s]
+            hit = k == keys[pending]
+            out[pending[hit]] = s[hit]
+            empty = k == _EMPTY
+            if insert and empty.any():
+                # several new keys may probe the same empty slot: the first claims it
+                cand = np.flatnonzero(empty)
+                _, first = np.unique(s[cand], return_index=True)
+                claim = cand[first]
+                self.keys[s[claim]] = keys[pending[claim]]
+                out[pending[claim]] = s[claim]
+                self.count += len(claim)
+                done = hit.copy()
+                done[claim] = True
+            else:
+                done = hit | empty
+            pending = pending[~done]
+            slots[pending] = (slots[pending] + 1) & self.mask
+        return out
+
+    def get_many(self, keys: np.ndarray) -> np.ndarray:
+        """Weights at an array of keys (0 for missing ones)."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        uniq, inv = np.unique(keys, return_inverse=True)
+        slots = self._probe(uniq, insert=False)
+        vals = np.where(slots >= 0, self.values[np.maximum(slots, 0)], 0)
+        return vals.astype(self.dtype)[inv.reshape(keys.shape)]
+
+    def add_many(self, keys: np.ndarray, deltas: np.ndarray) -> None:
+        """Add ``deltas[k]`` at ``keys[k]``; repeated keys accumulate."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        deltas = np.broadcast_to(deltas, keys.shape).reshape(-1).astype(np.float64)
+        uniq, inv = np.unique(keys.reshape(-1), return_inverse=True)
+        inv = inv.reshape(-1)
+        sums = np.bincount(inv, weights=deltas, minlength=len(uniq))
+        hits = np.bincount(inv, minlength=len(uniq)).astype(np.uint32)
+        # a budgeted table may hold fewer entries than one batch touches
+        step = len(uniq) if self.budget is None else max(1, int(self.max_load * self.capacity) // 2)
+        for i in range(0, len(uniq), step):
+            part = slice(i, i + step)
+            if self.count + len(uniq[part]) > self.max_load * self.capacity:
+                self._make_room(len(uniq[part]))
+            slots = self._probe(uniq[part], insert=True)
+            self.values[slots] += sums[part].astype(self.dtype)
+            self.visits[slots] += hits[part]
+            self.clock += 1
+            self.stamps[slots] = self.clock
+
+    # ──────────────────────── growth / eviction ───────────────────────
+
+    def _make_room(self, need: int) -> None:
+        keep = self.keys != _EMPTY
+        keys, values = self.keys[keep], self.values[keep]
+        visits, stamps = self.visits[keep], self.stamps[keep]
+        capacity = self.capacity
+        if self.budget is None:
+            while self.count + need > self.max_load * capacity:
+                capacity <<= 1
+        else:
+            limit = int(self.max_load * capacity)
+            if need > limit:
+                error(f"hash table budget too small for {need} new entries")
+                exit(1)
+            drop = max(len(keys) // 4, len(keys) + need - limit)
+            order = np.argsort(stamps if self.eviction == "lru" else visits, kind="stable")
+            survivors = np.sort(order[drop:])
+            keys, values = keys[survivors], values[survivors]
+            visits, stamps = visits[survivors], stamps[survivors]
+            self.evicted += drop
+        self._release()
+        self._alloc(capacity)
+        slots = self._probe(keys, insert=True)
+        self.values[slots] = values
+        self.visits[slots] = visits
+        self.stamps[slots] = stamps
+
+    def items(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compacted ``(keys, values, visits)`` of the stored entries."""
+        keep = self.keys != _EMPTY
+        return self.keys[keep], self.values[keep], self.visits[keep]
+
+    def load_items(self, keys: np.ndarray, values: np.ndarray, visits: np.ndarray) -> None:
+        """Replace the contents with the given entries."""
+        self._release()
+        capacity = self.capacity
+        while self.budget is None and len(keys) > self.max_load * capacity:
+            capacity <<= 1
+        self._alloc(capacity)
+        if len(keys) > self.max_load * capacity:
+            error("hash table budget too small for the stored entries")
+            exit(1)
+        slots = self._probe(np.asarray(keys, dtype=np.uint64), insert=True)
+        self.values[slots] = values
+        self.visits[slots] = visits
+
+
+# ──────────────────────────── sparse pattern ──────────────────────────
+
+class sparse_pattern(pattern):
+    """`pattern` whose weights live in a `HashTable` instead of a dense array.
+
+    Args:
+        patt, iso, dtype: as for `pattern`.
+        capacity, budget, eviction: forwarded to `HashTable`.
+    """
+
+    def __init__(
+        self,
+        patt: list[int],
+        iso: int = 8,
+        dtype: typing.Any = np.float32,
+        capacity: int = 1 << 16,
+        budget: int | None = None,
+        eviction: str = "lru",
+    ):
+        table = HashTable(1 << (len(patt) * 4), capacity, dtype, budget, eviction)
+        super().__init__(patt, iso, dtype, weight=table)
+
+    def nbytes(self) -> int:
+        return self.weight.nbytes
+
+    def release(self) -> None:
+        self.weight._release()
+
+    def stats(self) -> dict:
+        """Occupancy and memory use of the underlying table."""
+        return self.weight.stats()
+
+    def estimate(self, b: board | int) -> float:
+        get = self.weight.get
+        val = 0.0
+        for idx in self.indices(b):
+            val += get(idx)
+        return val
+
+    def update(self, b: board | int, u: float) -> float:
+        adjust = u / len(self.isom)
+        add = self.weight.add
+        val = 0.0
+        for idx in self.indices(b):
+            val += add(idx, adjust)
+        return val
+
+    def estimate_batch(self, raws: np.ndarray) -> np.ndarray:
+        idx = self.indices_batch(raws)
+        return self.weight.get_many(idx).sum(axis=1, dtype=np.float64).astype(np.float32)
+
+    def update_batch(self, raws: np.ndarray, deltas: np.ndarray) -> np.ndarray:
+        idx = self.indices_batch(raws)
+        adjust = np.asarray(deltas, dtype=np.float64).reshape(-1, 1) / len(self.isom)
+        self.weight.add_many(idx, np.broadcast_to(adjust, idx.shape))
+        return self.estimate_batch(raws)
+
+    # the TDL2048 layout stores dense tables only
+    def write(self, output: typing.BinaryIO) -> None:
+        error(f"{self.name()}: sparse tables cannot be written in the dense TDL2048 layout")
+        exit(1)
+
+    def read(self, input: typing.BinaryIO) -> None:
+        error(f"{self.name()}: sparse tables cannot be read from the dense TDL2048 layout")
+        exit(1)
@@ -0,0 +1,189 @@
+"""Constant‑memory training telemetry.
+
+`Metrics` is fed by `RLAgent.run_episode` (per‑phase timers and move
+counts) and by the learner (value estimates, updates, finished episodes).
+Everything it keeps is fixed size however long the run:
+
+* score and max‑tile histograms over the whole run,
+* a ring buffer of the last *window* scores for rolling means / quantiles,
+* counters for moves, value estimates and updates (rates are derived from
+  them between snapshots),
+* cumulative seconds spent in select, env step and update,
+* per‑report‑interval sums for the classic `flush_stats` printout.
+
+With *path* set, a snapshot line is appended every *export_every* episodes
+to a JSONL or CSV file; after *max_lines* lines it is rotated to
+``path + ".1"``, so ``tail -F path`` follows a 100k‑episode run while disk
+use stays bounded.
+"""
+import csv
+import io
+import json
+import os
+import time
+import typing
+
+import numpy as np
+
+__all__ = ["Histogram", "Rolling", "Metrics"]
+
+
+class Histogram:
+    """Counts over fixed bin *edges* (values below the first edge go to bin 0)."""
+
+    def __init__(self, edges: typing.Sequence[float]):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges), dtype=np.int64)
+
+    def add(self, value: float) -> None:
+        self.counts[max(0, int(np.searchsorted(self.edges, value, side="right")) - 1)] += 1
+
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def reset(self) -> None:
+        self.counts[:] = 0
+
+
+class Rolling:
+    """Mean and quantiles of the last *window* values (ring buffer)."""
+
+    def __init__(self, window: int = 1000):
+        self.values = np.zeros(window, dtype=np.float64)
+        self.n = 0  # values seen
+
+    def add(self, value: float) -> None:
+        self.values[self.n % len(self.values)] = value
+        self.n += 1
+
+    def _live(self) -> np.ndarray:
+        return self.values[: min(self.n, len(self.values))]
+
+    def mean(self) -> float:
+        live = self._live()
+        return float(live.mean()) if live.size else 0.0
+
+    def quantiles(self, qs: typing.Sequence[float] = (0.5, 0.9, 0.99)) -> list[float]:
+        live = self._live()
+        return np.quantile(live, qs).tolist() if live.size else [0.0] * len(qs)
+
+
+class Metrics:
+    """Training telemetry hub; see the module docstring.
+
+    Hot‑path counters are plain attributes (``metrics.estimates += 4``) and
+    phase times are added with `add_time`.
+    """
+
+    PHASES = ("select", "step", "update")
+
+    def __init__(
+        self,
+        window: int = 1000,
+        path: str | None = None,
+        fmt: str = "jsonl",
+        export_every: int = 100,
+        max_lines: int = 100_000,
+    ):
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"unknown telemetry format {fmt!r}")
+        self.path, self.fmt = path, fmt
+        self.export_every, self.max_lines = export_every, max_lines
+        self.scores = Rolling(window)
+        self.score_hist = Histogram([0] + [1 << k for k in range(21)])  # 0, 1, 2, 4, … 1M
+        self.tile_hist = Histogram(range(18))                            # log2 max tile
+        self.episodes = 0
+        self.moves = 0
+        self.estimates = 0
+        self.updates = 0
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+        # current report interval (flush_stats)
+        self._unit_tiles = np.zeros(18, dtype=np.int64)
+        self._unit_sum = 0.0
+        self._unit_max = 0.0
+        # rate baselines: (time, counters) of the previous snapshot per mark
+        self._t0 = time.perf_counter()
+        self._marks: dict[str, tuple[float, tuple[int, ...]]] = {}
+        self._lines = 0
+        self._columns: list[str] | None = None
+
+    # ─────────────────────────── feeding ──────────────────────────────────
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.seconds[phase] += seconds
+
+    def record_episode(self, score: float, max_tile: int) -> None:
+        """One finished game (*max_tile* as log2)."""
+        self.episodes += 1
+        self.scores.add(score)
+        self.score_hist.add(score)
+        self.tile_hist.add(max_tile)
+        self._unit_tiles[max_tile] += 1
+        self._unit_sum += score
+        self._unit_max = max(self._unit_max, score)
+        if self.path and self.episodes % self.export_every == 0:
+            self.export()
+
+    # ─────────────────────────── reporting ────────────────────────────────
+
+    def unit_report(self) -> tuple[int, float, float, np.ndarray]:
+        """``(games, avg, max, max‑tile counts)`` since the last `reset_unit`."""
+        n = int(self._unit_tiles.sum())
+        return n, (self._unit_sum / n if n else 0.0), self._unit_max, self._unit_tiles.copy()
+
+    def reset_unit(self) -> None:
+        self._unit_tiles[:] = 0
+        self._unit_sum = self._unit_max = 0.0
+
+    def snapshot(self, mark: str = "export") -> dict:
+        """Flat dict of the current state.  Rates cover the time since the
+        previous snapshot with the same *mark*, so independent consumers
+        (file export, console report) do not reset each other's rates."""
+        now = time.perf_counter()
+        t_last, last = self._marks.get(mark, (self._t0, (0, 0, 0, 0)))
+        dt = max(now - t_last, 1e-9)
+        totals = (self.episodes, self.moves, self.estimates, self.updates)
+        rates = [(b - a) / dt for a, b in zip(last, totals)]
+        self._marks[mark] = (now, totals)
+        p50, p90, p99 = self.scores.quantiles()
+        snap = {
+            "time": round(now - self._t0, 3),
+            "episodes": self.episodes,
+            "moves": self.moves,
+            "episodes_per_sec": rates[0],
+            "moves_per_sec": rates[1],
+            "estimates_per_sec": rates[2],
+            "updates_per_sec": rates[3],
+            "score_mean": self.scores.mean(),
+            "score_p50": p50,
+            "score_p90": p90,
+            "score_p99": p99,
+        }
+        snap.update({f"{p}_sec": s for p, s in self.seconds.items()})
+        counts = self.tile_hist.counts
+        total = max(1, int(counts.sum()))
+        for t in (11, 12, 13, 14, 15):  # reach rates: 2048 … 32768
+            snap[f"reach_{1 << t}"] = float(counts[t:].sum()) / total
+        return snap
+
+    def export(self) -> dict:
+        """Append a `snapshot` line to the ring file (rotating when full)."""
+        snap = self.snapshot()
+        if self._lines >= self.max_lines:
+            os.replace(self.path, self.path + ".1")
+            self._lines = 0
+        new = self._lines == 0
+        with open(self.path, "w" if new else "a", newline="") as out:
+            if self.fmt == "jsonl":
+                out.write(json.dumps(snap) + "\n")
+            else:
+                if new:
+                    self._columns = list(snap)
+                buf = io.StringIO()
+                w = csv.DictWriter(buf, self._columns, extrasaction="ignore")
+                if new:
+                    w.writeheader()
+                w.writerow(snap)
+                out.write(buf.getvalue())
+        self._lines += 1
+        return snap